@@ -0,0 +1,208 @@
+"""
+Closed-form amortization of a single debt.
+
+Each month of paying off a debt maps the balance `a` to
+`multiplier * a - constant`, so a run of months that share the same
+payment rule can be evaluated with the geometric series instead of
+being stepped through one month at a time. A schedule is a short list
+of those runs (segments), split wherever an annual fee is charged or
+the payment switches between a percentage of the balance and the
+minimum payment.
+"""
+from collections import namedtuple
+import math
+
+from api.utils import serialize_money
+
+
+CLOSED_FORM = 'closed_form'
+LOOP = 'loop'
+
+# Give up on schedules that are still not paid off after this many months
+MAX_MONTHS = 1000 * 12
+
+# Relative tolerance when comparing balances computed in a different order
+# than stepping through each month
+EPSILON = 1e-9
+
+# rate is the interest rate per month as a fraction
+# fee is charged every fee_interval months, starting with the first month
+Terms = namedtuple(
+    'Terms',
+    ['balance', 'rate', 'fee', 'fee_interval', 'min_payment', 'min_payment_percent'],
+)
+
+# `length` months starting at month `start` with an opening `balance`
+Segment = namedtuple('Segment', ['start', 'length', 'balance', 'multiplier', 'constant'])
+
+
+def power_sum(multiplier, months):
+    """ 1 + m + m**2 + ... + m**(months - 1) """
+    if multiplier == 1 or months <= 1:
+        return months
+    return (multiplier ** months - 1) / (multiplier - 1)
+
+
+def segment_balance(segment, months):
+    """ Balance after the first `months` months of segment """
+    return (segment.multiplier ** months * segment.balance
+            - segment.constant * power_sum(segment.multiplier, months))
+
+
+def segment_total(segment):
+    """ Sum of the opening balance of every month in segment """
+    m, n = segment.multiplier, segment.length
+    if m == 1:
+        offsets = n * (n - 1) / 2
+    else:
+        offsets = (power_sum(m, n) - n) / (m - 1)
+    return segment.balance * power_sum(m, n) - segment.constant * offsets
+
+
+def first_month_below(segment, threshold, limit):
+    """
+    Smallest number of months in [1, limit] after which the balance of
+    segment is at or below threshold, None if it stays above it.
+    """
+    m, c, balance = segment.multiplier, segment.constant, segment.balance
+    if m <= 0:
+        estimate = 1
+    elif m == 1:
+        if c <= 0:
+            return None
+        estimate = (balance - threshold) / c
+    else:
+        # balance - fixed_point grows (m > 1) or shrinks (m < 1) by m each month
+        fixed_point = c / (m - 1)
+        if m > 1 and balance >= fixed_point:
+            return None
+        if m < 1 and (balance <= fixed_point or threshold <= fixed_point):
+            return None
+        ratio = (threshold - fixed_point) / (balance - fixed_point)
+        estimate = math.log(ratio) / math.log(m)
+
+    if estimate > limit + 1:
+        return None
+    months = max(1, math.ceil(estimate))
+    # Correct for floating point error in the estimate
+    while months > 1 and segment_balance(segment, months - 1) <= threshold:
+        months -= 1
+    while months <= limit and segment_balance(segment, months) > threshold:
+        months += 1
+    if months > limit:
+        return None
+    return months
+
+
+def not_below(balance, previous_balance):
+    """ Whether balance has not gone down from previous_balance """
+    return balance >= previous_balance * (1 - EPSILON)
+
+
+def fee_months(terms, num_months):
+    """ Number of times the fee is charged in the first num_months """
+    if not terms.fee or num_months == 0:
+        return 0
+    return (num_months - 1) // terms.fee_interval + 1
+
+
+def amortize(terms, monthly_payment=None):
+    """
+    Schedule for paying off a debt with monthly_payment each month.
+
+    Without a monthly_payment (and with a min_payment_percent) each month
+    pays that percent of the balance, but never less than min_payment.
+
+    Returns the segments of the schedule along with num_months,
+    total_interest_paid and total_paid, num_months is -1 if the debt
+    is never paid off.
+    """
+    growth = 1 + terms.rate
+    percent = terms.min_payment_percent
+    fixed_payment = None
+    if monthly_payment or not percent:
+        fixed_payment = max(monthly_payment or 0, terms.min_payment)
+
+    segments = []
+    balance = terms.balance
+    month = 0
+    while balance > 0:
+        remaining = MAX_MONTHS - month
+        if remaining <= 0:
+            return {'num_months': -1}
+
+        fee = 0
+        limit = remaining
+        if terms.fee:
+            if terms.fee_interval == 1:
+                fee = terms.fee
+            elif month % terms.fee_interval == 0:
+                fee = terms.fee
+                limit = 1
+            else:
+                limit = min(remaining, terms.fee_interval - month % terms.fee_interval)
+
+        switch = None
+        if fixed_payment is not None:
+            multiplier, constant = growth, fixed_payment - fee
+        elif percent * (balance * growth + fee) > terms.min_payment:
+            multiplier, constant = growth * (1 - percent), -fee * (1 - percent)
+            # Below this balance the percent is less than the minimum payment
+            switch = (terms.min_payment / percent - fee) / growth
+        else:
+            multiplier, constant = growth, terms.min_payment - fee
+
+        segment = Segment(month, limit, balance, multiplier, constant)
+        if limit > 1 and not_below(segment_balance(segment, 1), balance):
+            # The payment does not cover the interest
+            return {'num_months': -1}
+
+        length = first_month_below(segment, 0, limit)
+        if length is not None:
+            segments.append(segment._replace(length=length))
+            month += length
+            break
+        if switch is not None:
+            length = first_month_below(segment, switch, limit)
+        if length is None:
+            if limit == remaining:
+                return {'num_months': -1}
+            length = limit
+
+        segments.append(segment._replace(length=length))
+        month += length
+        balance = segment_balance(segment, length)
+        if not_below(balance, terms.balance):
+            return {'num_months': -1}
+
+    total_interest = terms.rate * sum(segment_total(segment) for segment in segments)
+    return {
+        'segments': segments,
+        'num_months': month,
+        'total_interest_paid': total_interest,
+        'total_paid': terms.balance + total_interest + terms.fee * fee_months(terms, month),
+    }
+
+
+def balances(segments):
+    """ Balance at the end of each month of the schedule """
+    for index, segment in enumerate(segments):
+        for months in range(1, segment.length + 1):
+            balance = segment_balance(segment, months)
+            if balance < 0 or (index == len(segments) - 1 and months == segment.length):
+                # Paid off
+                balance = 0.0
+            yield balance
+
+
+def timeline(terms, monthly_payment=None):
+    """ Closed-form equivalent of the month by month timeline() of a debt """
+    schedule = amortize(terms, monthly_payment)
+    if schedule['num_months'] == -1:
+        return {'num_months': -1}
+    return {
+        'debt_per_month': list(balances(schedule['segments'])),
+        'num_months': schedule['num_months'],
+        'total_interest_paid': schedule['total_interest_paid'],
+        'total_paid': serialize_money(round(schedule['total_paid'])),
+    }
@@ -0,0 +1,27 @@
+from django.urls import URLPattern
+
+from . import urls
+from .concurrency import async_view
+
+
+# The views whose GET requests are async for ?wait=, see api.concurrency,
+# the other methods are left to the view
+ASYNC_VIEWS = {
+    'api-root',
+    'creditcard-list', 'creditcard-detail',
+    'expense-list', 'expense-detail',
+    'income-list', 'income-detail',
+    'overdraft-list', 'overdraft-detail',
+    'type-list', 'type-detail',
+    'investment-list', 'investment-detail',
+    'taxbracket-list', 'taxbracket-detail',
+    'user-list', 'user-detail',
+    'get-debts',
+    'get-timeline',
+}
+
+urlpatterns = [
+    URLPattern(pattern.pattern, async_view(pattern.callback), pattern.default_args, pattern.name)
+    if getattr(pattern, 'name', None) in ASYNC_VIEWS else pattern
+    for pattern in urls.urlpatterns
+]
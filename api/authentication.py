@@ -0,0 +1,86 @@
+"""
+Token authentication that keeps recently used tokens in memory.
+
+Each process keeps up to MAX_SIZE tokens for TIMEOUT seconds, so polling
+clients are authenticated without a query. Entries are dropped when the
+token is deleted or regenerated or when its user is saved, which covers
+deactivation, see the receivers in api.models. Those signals only reach
+the process making the change, other processes notice after TIMEOUT at
+the latest, as they do for changes that don't send signals such as
+QuerySet.update().
+"""
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from rest_framework.authentication import TokenAuthentication
+
+
+# Most tokens kept, the least recently used is dropped first
+MAX_SIZE = 10000
+# Seconds before a token is checked against the database again
+TIMEOUT = 60
+
+
+class TokenCache:
+    """ Least recently used cache of token key to Token, along with its user, with a timeout """
+
+    def __init__(self, max_size=MAX_SIZE, timeout=TIMEOUT, clock=time.monotonic):
+        self.max_size = max_size
+        self.timeout = timeout
+        self.clock = clock
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        """ The Token for key, None if it isn't cached or has timed out """
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            token, expires = entry
+            if expires <= self.clock():
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return token
+
+    def set(self, token):
+        with self.lock:
+            self.entries[token.key] = (token, self.clock() + self.timeout)
+            self.entries.move_to_end(token.key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+    def delete_user(self, user_id):
+        """ Drop every token of the user """
+        with self.lock:
+            for key in [key for key, (token, expires) in self.entries.items() if token.user_id == user_id]:
+                del self.entries[key]
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+tokens = TokenCache()
+
+
+def copy_token(token):
+    """ A copy of token along with its user, so requests don't share the cached ones """
+    token = copy.copy(token)
+    token.user = copy.copy(token.user)
+    return token
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """ TokenAuthentication using the tokens cache """
+
+    def authenticate_credentials(self, key):
+        token = tokens.get(key)
+        if token is None:
+            user, token = super().authenticate_credentials(key)
+            tokens.set(token)
+        token = copy_token(token)
+        return token.user, token
@@ -0,0 +1,120 @@
+"""
+Creating, updating and deleting a list of rows in one request.
+
+The whole list is validated before anything is saved, errors are
+returned as a list with an entry for each item, {} for the valid ones.
+Nothing is saved unless every item is valid.
+"""
+import uuid
+
+from django.db import transaction
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.response import Response
+
+from api.models import batch_data_changes
+
+
+class BulkMixin:
+    """ bulk_create, bulk_partial_update and bulk_destroy actions for a ModelViewSet """
+    # Most items accepted in one request
+    max_bulk_size = 1000
+
+    def bulk_errors(self, items):
+        """ Response for a payload that isn't a list of at most max_bulk_size items """
+        if not isinstance(items, list):
+            return Response(
+                {'non_field_errors': ['Expected a list of items.']},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if len(items) > self.max_bulk_size:
+            return Response(
+                {'non_field_errors': ['At most {} items can be sent at once.'.format(self.max_bulk_size)]},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        return None
+
+    def get_bulk_instances(self, items, get_id=lambda item: item):
+        """
+        The user's instances for items by id along with an error for each item,
+        an id that isn't valid, found or is repeated is an error.
+        """
+        ids = []
+        errors = []
+        for item in items:
+            try:
+                pk = uuid.UUID(str(get_id(item)))
+            except (KeyError, TypeError, ValueError):
+                ids.append(None)
+                errors.append({'id': ['Must be a valid UUID.']})
+                continue
+            errors.append({'id': ['Repeated.']} if pk in ids else {})
+            ids.append(pk)
+
+        instances = self.filter_queryset(self.get_queryset()).in_bulk([pk for pk in ids if pk])
+        for pk, error in zip(ids, errors):
+            if pk and not error and pk not in instances:
+                error['id'] = ['Not found.']
+        return ids, instances, errors
+
+    def bulk_create(self, request, *args, **kwargs):
+        response = self.bulk_errors(request.data)
+        if response:
+            return response
+        serializer = self.get_serializer(data=request.data, many=True)
+        serializer.is_valid(raise_exception=True)
+
+        model = self.get_queryset().model
+        instances = [model(**attrs) for attrs in serializer.validated_data]
+        with transaction.atomic(), batch_data_changes() as changed:
+            model.objects.bulk_create(instances)
+            # bulk_create() doesn't send post_save
+            changed.add(request.user.pk)
+        return Response(self.get_serializer(instances, many=True).data, status=status.HTTP_201_CREATED)
+
+    def bulk_partial_update(self, request, *args, **kwargs):
+        """ Each item has the id of the row to update and the fields to change """
+        response = self.bulk_errors(request.data)
+        if response:
+            return response
+        ids, instances, errors = self.get_bulk_instances(request.data, lambda item: item['id'])
+
+        serializers = []
+        for item, pk, error in zip(request.data, ids, errors):
+            if error:
+                continue
+            serializer = self.get_serializer(instances[pk], data=item, partial=True)
+            if serializer.is_valid():
+                serializers.append(serializer)
+            else:
+                error.update(serializer.errors)
+        if any(errors):
+            return Response(errors, status=status.HTTP_400_BAD_REQUEST)
+
+        now = timezone.now()
+        fields = {'date_updated'}
+        for serializer in serializers:
+            for attr, value in serializer.validated_data.items():
+                setattr(serializer.instance, attr, value)
+                fields.add(attr)
+            # bulk_update() doesn't set auto_now fields
+            serializer.instance.date_updated = now
+        updated = [serializer.instance for serializer in serializers]
+        with transaction.atomic(), batch_data_changes() as changed:
+            self.get_queryset().model.objects.bulk_update(updated, sorted(fields))
+            # bulk_update() doesn't send post_save
+            changed.add(request.user.pk)
+        return Response(self.get_serializer(updated, many=True).data)
+
+    def bulk_destroy(self, request, *args, **kwargs):
+        """ The items are the ids of the rows to delete """
+        response = self.bulk_errors(request.data)
+        if response:
+            return response
+        ids, instances, errors = self.get_bulk_instances(request.data)
+        if any(errors):
+            return Response(errors, status=status.HTTP_400_BAD_REQUEST)
+
+        with transaction.atomic(), batch_data_changes():
+            self.get_queryset().model.objects.filter(pk__in=list(instances)).delete()
+        return Response(status=status.HTTP_204_NO_CONTENT)
@@ -0,0 +1,48 @@
+"""
+Per user cache of the results computed for /debts/ and /timeline/.
+
+Every cached result for a user is keyed on that user's data version,
+so any change to the user's data makes all of them stale at once.
+"""
+from django.core.cache import cache
+
+from api.models import get_data_version
+
+
+# Seconds to keep a result for
+TIMEOUT = 60 * 60
+
+HITS = 'results:hits'
+MISSES = 'results:misses'
+
+
+def count(key):
+    if cache.add(key, 1, None):
+        return
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 1, None)
+
+
+def stats():
+    """ Number of cache hits and misses so far """
+    return {
+        'hits': cache.get(HITS, 0),
+        'misses': cache.get(MISSES, 0),
+    }
+
+
+def get_or_compute(request, name, compute):
+    """ Cached result of compute() for the requesting user under name """
+    user_id = request.user.pk
+    version, date_updated = getattr(request, 'data_version', None) or get_data_version(user_id)
+    key = 'results:{}:{}:{}'.format(user_id, version, name)
+    result = cache.get(key)
+    if result is None:
+        count(MISSES)
+        result = compute()
+        cache.set(key, result, TIMEOUT)
+    else:
+        count(HITS)
+    return result
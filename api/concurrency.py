@@ -0,0 +1,164 @@
+"""
+Serving many clients from one process under ASGI, see debt.asgi.
+
+async_view() makes an async version of a view for its GET requests, the
+other methods are the view as it was. They are in ASGI_URLCONF, which
+asgi_urlconf_middleware() picks for requests under ASGI. Under WSGI the
+views are left synchronous, as an async view would only add the cost of
+an event loop to each request there. Django 4.0 has no async ORM and
+DRF's views are synchronous, so the view itself still runs in a thread
+with sync_to_async(). The async part is the waiting: ?wait=<seconds>
+along with If-None-Match holds a polling client until their data
+changes, or the wait is over, and then answers as usual. The event loop
+does the holding rather than a thread. Only the version checks, every
+POLL_INTERVAL seconds, borrow a thread.
+
+Under WSGI there is no event loop to do the holding, each request has a
+worker of its own, so ?wait= is ignored there and the response is
+immediate.
+
+Timeline simulations are CPU bound. run_simulation() runs them in a
+pool of threads of their own, rather than the thread the view runs in,
+which sync_to_async() can share between requests, so a long simulation
+doesn't hold up the others. With SIMULATION_PROCESSES they are run in a
+pool of processes instead, so they use more than one core and don't hold
+the GIL that the other requests' threads need.
+"""
+import asyncio
+import functools
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import django
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import JsonResponse
+from django.utils.decorators import sync_and_async_middleware
+from rest_framework import exceptions
+
+from api.authentication import CachedTokenAuthentication
+from api.conditional import etag_prefix
+from api.models import get_data_version
+
+
+# Longest a client can wait for a change with ?wait=
+MAX_WAIT = 60
+# Seconds between checks of the user's data version while waiting
+POLL_INTERVAL = 1
+
+
+def parse_wait(request):
+    """ Seconds from ?wait=, None without it, ValueError if it isn't 0 to MAX_WAIT """
+    wait = request.GET.get('wait')
+    if wait is None:
+        return None
+    wait = float(wait)
+    if not 0 <= wait <= MAX_WAIT:
+        raise ValueError('wait out of range')
+    return wait
+
+
+def current_etag(request):
+    """
+    Start of the ETag of the requesting user's data, it ends with the
+    format chosen by the view. None if they aren't authenticated.
+    """
+    try:
+        authenticated = CachedTokenAuthentication().authenticate(request)
+    except exceptions.AuthenticationFailed:
+        # The view answers with the error
+        return None
+    if authenticated is None:
+        return None
+    user_id = authenticated[0].pk
+    return etag_prefix(get_data_version(user_id)[0], user_id)
+
+
+async def wait_for_change(request, wait):
+    """ Return when the client's ETag is out of date or after wait seconds """
+    client_etag = request.META.get('HTTP_IF_NONE_MATCH')
+    if not client_etag:
+        return
+    deadline = time.monotonic() + wait
+    get_etag = sync_to_async(current_etag)
+    while True:
+        etag = await get_etag(request)
+        remaining = deadline - time.monotonic()
+        if etag is None or etag not in client_etag or remaining <= 0:
+            return
+        await asyncio.sleep(min(POLL_INTERVAL, remaining))
+
+
+# Requests async_view() is for, DRF answers HEAD with the GET action
+READ_METHODS = ('GET', 'HEAD')
+
+
+def async_view(view):
+    """
+    Async version of a view's GET requests, with ?wait= under ASGI.
+    Other methods, the writes, are left to the view in a thread, as
+    Django runs synchronous views under ASGI.
+    """
+    run_view = sync_to_async(view)
+
+    @functools.wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        if request.method not in READ_METHODS:
+            return await run_view(request, *args, **kwargs)
+        if isinstance(request, ASGIRequest):
+            try:
+                wait = parse_wait(request)
+            except ValueError:
+                return JsonResponse(
+                    {'wait': ['Must be a number of seconds up to {}.'.format(MAX_WAIT)]},
+                    status=400,
+                )
+            if wait:
+                await wait_for_change(request, wait)
+        return await run_view(request, *args, **kwargs)
+    return wrapper
+
+
+@sync_and_async_middleware
+def asgi_urlconf_middleware(get_response):
+    """
+    The URLs of ASGI_URLCONF, with the async views, for requests under
+    ASGI. Django passes an async get_response there, as long as this is
+    the last of the MIDDLEWARE.
+    """
+    if not asyncio.iscoroutinefunction(get_response):
+        return get_response
+
+    async def middleware(request):
+        request.urlconf = settings.ASGI_URLCONF
+        return await get_response(request)
+    return middleware
+
+
+simulation_threads = ThreadPoolExecutor(thread_name_prefix='simulation')
+simulation_pool = None
+simulation_pool_lock = threading.Lock()
+
+
+def run_simulation(function, *args, **kwargs):
+    """
+    function(*args, **kwargs) in the pool of SIMULATION_PROCESSES
+    processes, or in the pool of threads when it is 0
+    """
+    global simulation_pool
+    if not settings.SIMULATION_PROCESSES:
+        return simulation_threads.submit(function, *args, **kwargs).result()
+    with simulation_pool_lock:
+        if simulation_pool is None:
+            # The debts are model instances, the processes need the apps loaded to unpickle them.
+            # Spawned rather than forked, a fork would copy this process's threads' locks and
+            # database connections
+            simulation_pool = ProcessPoolExecutor(
+                settings.SIMULATION_PROCESSES,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=django.setup,
+            )
+    return simulation_pool.submit(function, *args, **kwargs).result()
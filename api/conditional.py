@@ -0,0 +1,81 @@
+"""
+Conditional GET for responses that only depend on the user's data.
+
+The ETag and Last-Modified validators come from the user's data version
+so an unchanged response is answered with 304 Not Modified without
+running the queries or serializers for the response. The view looks up
+the row and checks the query parameters first, so they are still answered
+with 404 or 400.
+"""
+import time
+
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date
+from rest_framework.response import Response
+
+from api.models import get_data_version
+
+
+def etag_prefix(version, user_id):
+    """ Start of the ETags of the user's data, whichever format it is rendered in """
+    return 'W/"{}-{}-'.format(user_id, version)
+
+
+def validators(version, date_updated, user_id, renderer_format):
+    """ (etag, last_modified) for the user's data rendered as renderer_format """
+    etag = '{}{}"'.format(etag_prefix(version, user_id), renderer_format)
+    last_modified = int(date_updated.timestamp()) if date_updated else None
+    if last_modified is not None and time.time() < last_modified + 1:
+        # Last-Modified is in whole seconds, another change in the same
+        # second would have the same one
+        last_modified = None
+    return etag, last_modified
+
+
+def conditional_response(request, get_response):
+    """ 304 if the client has the current version, otherwise get_response() """
+    # Kept for caching.get_or_compute() so it is only looked up once
+    request.data_version = get_data_version(request.user.pk)
+    etag, last_modified = validators(
+        *request.data_version,
+        request.user.pk,
+        request.accepted_renderer.format,
+    )
+
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        response = get_response()
+    if response.status_code in (200, 304):
+        response['ETag'] = etag
+        if last_modified is not None:
+            response['Last-Modified'] = http_date(last_modified)
+        # The format can be chosen with Accept as well as ?format=
+        patch_vary_headers(response, ('Accept',))
+    return response
+
+
+class ConditionalGetMixin:
+    """ Conditional GET for the list and retrieve actions of a ViewSet """
+
+    def check_query_params(self, request):
+        """ Raise the errors the query parameters would give before a 304 hides them """
+        if hasattr(self, 'get_requested_fields'):
+            self.get_requested_fields()
+
+    def list(self, request, *args, **kwargs):
+        self.check_query_params(request)
+        if hasattr(self.paginator, 'decode_cursor'):
+            self.paginator.decode_cursor(request, self.get_queryset().model)
+        return conditional_response(
+            request,
+            lambda: super(ConditionalGetMixin, self).list(request, *args, **kwargs),
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        self.check_query_params(request)
+        # 404 for another user's row rather than 304
+        instance = self.get_object()
+        return conditional_response(
+            request,
+            lambda: Response(self.get_serializer(instance).data),
+        )
@@ -0,0 +1,76 @@
+"""
+Reducing a timeline to fewer points for charts.
+
+Both work on a stream of (month, debt) points so the full timeline
+never has to be held in memory.
+"""
+
+
+RESOLUTIONS = {
+    'monthly': 1,
+    'quarterly': 3,
+    'yearly': 12,
+}
+
+
+def every(points, months):
+    """ Keep every months'th point and the last point """
+    last = None
+    for point in points:
+        if point[0] % months == 0:
+            yield point
+            last = None
+        else:
+            last = point
+    if last is not None:
+        yield last
+
+
+def every_length(num_months, months):
+    """ Number of points every() keeps from num_months points """
+    return num_months // months + (1 if num_months % months else 0)
+
+
+def lttb(points, length, threshold):
+    """
+    Largest-Triangle-Three-Buckets downsampling of `length` points to
+    `threshold` points, keeping the shape of the line.
+
+    The points are read one bucket at a time, only the current and
+    the following bucket are held in memory.
+    """
+    points = iter(points)
+    if threshold >= length or threshold < 3:
+        yield from points
+        return
+
+    def bucket(index):
+        # Integer bounds so the buckets cover every point between the first
+        # and the last, float rounding could leave the last point unread
+        start = index * (length - 2) // (threshold - 2) + 1
+        end = (index + 1) * (length - 2) // (threshold - 2) + 1
+        return [next(points) for _ in range(end - start)]
+
+    selected = next(points)
+    yield selected
+    current = bucket(0)
+    for index in range(threshold - 2):
+        if index + 1 < threshold - 2:
+            following = bucket(index + 1)
+        else:
+            last = next(points)
+            following = [last]
+        average_x = sum(point[0] for point in following) / len(following)
+        average_y = sum(point[1] for point in following) / len(following)
+        x, y = selected
+        # The point making the largest triangle with the previous selected
+        # point and the average of the following bucket
+        selected = max(
+            current,
+            key=lambda point: abs(
+                (x - average_x) * (point[1] - y) - (x - point[0]) * (average_y - y)
+            ),
+        )
+        yield selected
+        current = following
+    yield last
@@ -0,0 +1,100 @@
+"""
+Exporting all of a user's data.
+
+The rows are read from the database CHUNK_SIZE at a time with
+.iterator() and written out as they are read, so the whole export is
+never held in memory.
+
+NDJSON has a line for every row of every model with the model's name
+under "model". CSV has one file per model with a header row. Money is
+in cents, the same as it is stored.
+"""
+import csv
+import datetime
+import json
+import uuid
+
+from api.models import CreditCard, Expense, Income, Investment, Overdraft, TaxBracket, Type
+
+
+FORMATS = ('ndjson', 'csv')
+
+CONTENT_TYPES = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+}
+
+# Types first, the expenses refer to them
+MODELS = {
+    'types': Type,
+    'incomes': Income,
+    'expenses': Expense,
+    'credit_cards': CreditCard,
+    'overdrafts': Overdraft,
+    'investments': Investment,
+    'tax_brackets': TaxBracket,
+}
+
+# Rows read from the database and written out at a time
+CHUNK_SIZE = 2000
+
+
+def columns(model):
+    """ Exported columns of model, all but the user """
+    return [field.attname for field in model._meta.concrete_fields if field.attname != 'user_id']
+
+
+def exportable(value):
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return value.isoformat()
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    return value
+
+
+def rows(user, model, chunk_size=CHUNK_SIZE):
+    """ The user's rows of model as tuples of columns(model), oldest first """
+    return (
+        model.objects.filter(user=user)
+        .order_by('date_created', 'id')
+        .values_list(*columns(model))
+        .iterator(chunk_size=chunk_size)
+    )
+
+
+def ndjson(user, chunk_size=CHUNK_SIZE):
+    """ Chunks of NDJSON of all of the user's data """
+    for name, model in MODELS.items():
+        names = columns(model)
+        lines = []
+        for row in rows(user, model, chunk_size):
+            record = {'model': name}
+            record.update(zip(names, map(exportable, row)))
+            lines.append(json.dumps(record) + '\n')
+            if len(lines) == chunk_size:
+                yield ''.join(lines)
+                lines = []
+        if lines:
+            yield ''.join(lines)
+
+
+class Echo:
+    """ File for csv.writer() that returns what is written instead """
+
+    def write(self, value):
+        return value
+
+
+def csv_file(user, name, chunk_size=CHUNK_SIZE):
+    """ Chunks of a CSV file of the user's rows of the model called name """
+    model = MODELS[name]
+    writer = csv.writer(Echo())
+    yield writer.writerow(columns(model))
+    lines = []
+    for row in rows(user, model, chunk_size):
+        lines.append(writer.writerow(map(exportable, row)))
+        if len(lines) == chunk_size:
+            yield ''.join(lines)
+            lines = []
+    if lines:
+        yield ''.join(lines)
@@ -0,0 +1,149 @@
+"""
+Sparse fieldsets and a lean path for the list endpoints.
+
+?fields=id,name,balance limits a response to those fields and only reads
+their columns from the database.
+
+A list whose fields all come straight from columns, or are the url, is
+read with .values() and each column is converted at once with the
+serializer field's to_representation_many(), or to_representation().
+That skips creating the model instances and the serializer's work for
+each field, and the URLs are built from one prefix rather than a
+reverse() each. The output is the same as the serializer's. Fields
+that need an instance, such as nested serializers and method fields
+other than url, use the serializer.
+"""
+from rest_framework import serializers
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+
+from api.utils import detail_url_parts
+
+
+class SparseFieldsMixin:
+    """ ?fields= for the GET actions of a ViewSet along with the lean list """
+    fields_query_param = 'fields'
+
+    def get_readable_fields(self):
+        """ The serializer's fields that are in responses by name """
+        if not hasattr(self, '_readable_fields'):
+            serializer = self.get_serializer_class()(context=self.get_serializer_context())
+            self._readable_fields = {
+                name: field for name, field in serializer.fields.items() if not field.write_only
+            }
+        return self._readable_fields
+
+    def get_requested_fields(self):
+        """ Fields from ?fields= in the serializer's order, None for all of them """
+        if self.request.method != 'GET':
+            return None
+        if not hasattr(self, '_requested_fields'):
+            self._requested_fields = None
+            names = self.request.query_params.get(self.fields_query_param)
+            if names is not None:
+                readable = self.get_readable_fields()
+                names = set(name.strip() for name in names.split(','))
+                if not names <= set(readable):
+                    raise ValidationError({self.fields_query_param: [
+                        'Must be a comma separated list of fields, '
+                        'the fields being some of {}.'.format(', '.join(readable)),
+                    ]})
+                self._requested_fields = [name for name in readable if name in names]
+        return self._requested_fields
+
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+        names = self.get_requested_fields()
+        if names is not None:
+            fields = getattr(serializer, 'child', serializer).fields
+            for name in list(fields):
+                if name not in names:
+                    fields.pop(name)
+        return serializer
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        names = self.get_requested_fields()
+        if names is None:
+            return queryset
+        readable = self.get_readable_fields()
+        columns = [column_name(queryset.model, readable[name], relations=True) for name in names]
+        if None in columns:
+            # A method field could use any of the columns
+            return queryset
+        # The id for the url and the ordering for the pagination
+        columns += ['id'] + list(getattr(self.paginator, 'ordering', ()))
+        related = queryset.query.select_related
+        if isinstance(related, dict):
+            # Deferred relations can't be selected as well
+            queryset = queryset.select_related(None)
+            related = [name for name in related if name in columns]
+            if related:
+                queryset = queryset.select_related(*related)
+        return queryset.only(*set(columns))
+
+    def get_lean_fields(self):
+        """
+        (name, column, to_representation_many) for each field of the list,
+        None when any of them needs the model instance
+        """
+        model = self.get_queryset().model
+        readable = self.get_readable_fields()
+        names = self.get_requested_fields() or list(readable)
+        lean = []
+        for name in names:
+            field = readable[name]
+            if name == 'url' and isinstance(field, serializers.SerializerMethodField):
+                prefix, suffix = detail_url_parts(model._meta.model_name + '-detail')
+                lean.append((name, 'id', lambda ids, prefix=prefix, suffix=suffix: [
+                    prefix + str(pk) + suffix for pk in ids
+                ]))
+                continue
+            column = column_name(model, field)
+            if column is None:
+                return None
+            lean.append((name, column, getattr(field, 'to_representation_many', None) or (
+                lambda values, field=field: [
+                    None if value is None else field.to_representation(value) for value in values
+                ]
+            )))
+        return lean
+
+    def list(self, request, *args, **kwargs):
+        lean = self.get_lean_fields()
+        if lean is None:
+            return super().list(request, *args, **kwargs)
+
+        columns = set(column for name, column, to_representation_many in lean)
+        columns.update(getattr(self.paginator, 'ordering', ()))
+        queryset = self.filter_queryset(self.get_queryset()).prefetch_related(None).values(*columns)
+        page = self.paginate_queryset(queryset)
+        rows = list(queryset if page is None else page)
+        # Each field is converted a column at a time
+        names = [name for name, column, to_representation_many in lean]
+        values = [
+            to_representation_many([row[column] for row in rows])
+            for name, column, to_representation_many in lean
+        ]
+        data = [dict(zip(names, row)) for row in zip(*values)]
+        if page is None:
+            return Response(data)
+        return self.get_paginated_response(data)
+
+
+# Fields for related rows rather than a column
+RELATION_FIELDS = (serializers.BaseSerializer, serializers.RelatedField, serializers.ManyRelatedField)
+
+
+def column_name(model, field, relations=False):
+    """
+    Column of model that field is read from, None if it isn't from one
+    of them, or is a relation and relations is False
+    """
+    if isinstance(field, serializers.SerializerMethodField):
+        # get_url() only needs the id, other methods could use anything
+        return 'id' if field.field_name == 'url' else None
+    if not relations and isinstance(field, RELATION_FIELDS):
+        return None
+    names = {model_field.name for model_field in model._meta.concrete_fields}
+    return field.source if field.source in names else None
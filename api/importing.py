@@ -0,0 +1,255 @@
+"""
+Importing expenses and incomes from bank exports.
+
+CSV files are read a line at a time, and OFX files, which can be a single
+line, OFX_READ_SIZE bytes at a time. The rows are saved with
+bulk_create() every CHUNK_SIZE rows, so memory use doesn't grow with the
+size of the file.
+
+CSV files have a header with at least `name` and `amount` columns and
+optionally `kind` (expense or income), `type`, `frequency`, `pay_type`
+and `pay_day`. Without a kind, negative amounts are expenses and positive
+amounts are incomes.
+
+OFX files have a transaction for each <STMTTRN>, debits are expenses and
+credits are incomes.
+"""
+import codecs
+import csv
+import functools
+import html
+import re
+
+from django.db import transaction
+from rest_framework import serializers
+
+from api.models import DayOfWeek, Expense, Income, PayType, Type, batch_data_changes
+from api.serializers import MoneyField
+
+
+FORMATS = ('csv', 'ofx')
+
+# Rows saved with each bulk_create()
+CHUNK_SIZE = 500
+# Bytes of an OFX file read at a time
+OFX_READ_SIZE = 64 * 1024
+# Errors kept for the summary, the rest are only counted
+MAX_ERRORS = 100
+
+EXPENSE = 'expense'
+INCOME = 'income'
+
+
+class InvalidFile(Exception):
+    pass
+
+
+class InvalidRow(Exception):
+    pass
+
+
+def guess_format(file_name):
+    """ Format from the file's extension, None if it isn't one of FORMATS """
+    extension = file_name.rsplit('.', 1)[-1].lower()
+    return extension if extension in FORMATS else None
+
+
+def csv_rows(lines):
+    """ (line number, row) for each row of CSV lines of bytes """
+    reader = csv.DictReader(codecs.iterdecode(lines, 'utf-8-sig'))
+    if reader.fieldnames is None:
+        raise InvalidFile('The file is empty.')
+    reader.fieldnames = [name.strip().lower() for name in reader.fieldnames]
+    missing = {'name', 'amount'} - set(reader.fieldnames)
+    if missing:
+        raise InvalidFile('Missing the columns: {}.'.format(', '.join(sorted(missing))))
+    for row in reader:
+        yield reader.line_num, row
+
+
+OFX_TAG = re.compile(r'<(/?)([A-Za-z0-9.]+)>([^<]*)')
+
+
+def ofx_tags(file, read_size=OFX_READ_SIZE):
+    """ (closing, tag, value) for each tag of an OFX file of bytes """
+    pieces = iter(functools.partial(file.read, read_size), b'')
+    text = ''
+    for piece in codecs.iterdecode(pieces, 'utf-8-sig', errors='replace'):
+        text += piece
+        # Only the last tag is kept, it or its value may continue in the next piece
+        end = text.rfind('<')
+        if end == -1:
+            text = ''
+            continue
+        for match in OFX_TAG.finditer(text, 0, end):
+            yield ofx_tag(match)
+        text = text[end:]
+    for match in OFX_TAG.finditer(text):
+        yield ofx_tag(match)
+
+
+def ofx_tag(match):
+    closing, tag, value = match.groups()
+    # Values of XML files have entities, and either may be split over lines
+    return closing, tag.upper(), html.unescape(' '.join(value.split()))
+
+
+def ofx_rows(file):
+    """
+    (transaction number, row) for each <STMTTRN> of an OFX file of bytes,
+    either SGML, where only the aggregates have closing tags, or XML.
+    """
+    number = 0
+    fields = None
+    for closing, tag, value in ofx_tags(file):
+        if tag == 'STMTTRN':
+            if closing and fields is not None:
+                number += 1
+                yield number, ofx_row(fields)
+            fields = None if closing else {}
+        elif fields is not None and not closing and value:
+            fields[tag] = value
+
+
+def ofx_row(fields):
+    """ The same row as a CSV file would have for an OFX transaction """
+    amount = fields.get('TRNAMT', '')
+    if amount and '.' not in amount:
+        amount += '.00'
+    return {
+        'name': fields.get('NAME') or fields.get('MEMO') or '',
+        'amount': amount,
+    }
+
+
+ROWS = {
+    'csv': csv_rows,
+    'ofx': ofx_rows,
+}
+
+
+def choice(labels, value, default):
+    """ Value of a choice from its label, default when blank """
+    if not value:
+        return default
+    for index, label in enumerate(labels):
+        if label.lower() == value.strip().lower():
+            return index
+    raise InvalidRow('"{}" is not one of {}.'.format(value, ', '.join(labels)))
+
+
+class Importer:
+    """ Saves rows as expenses and incomes for a user a chunk at a time """
+
+    def __init__(self, user, chunk_size=CHUNK_SIZE, progress=None):
+        self.user = user
+        self.chunk_size = chunk_size
+        # Called with the summary so far after each chunk
+        self.progress = progress
+        self.money = MoneyField()
+        self.types = None
+        self.new_types = []
+        self.expenses = []
+        self.incomes = []
+        self.summary = {
+            'rows': 0,
+            'expenses': 0,
+            'incomes': 0,
+            'types': 0,
+            'errors': 0,
+            'error_rows': [],
+        }
+
+    def get_type(self, name):
+        """ The user's type with name, created if there isn't one """
+        if self.types is None:
+            self.types = {expense_type.name: expense_type for expense_type in Type.objects.filter(user=self.user)}
+        if name not in self.types:
+            expense_type = Type(name=name, user=self.user)
+            self.types[name] = expense_type
+            self.new_types.append(expense_type)
+        return self.types[name]
+
+    def instance(self, row):
+        name = (row.get('name') or '').strip()
+        if not name:
+            raise InvalidRow('A name is required.')
+        try:
+            amount = self.money.to_internal_value((row.get('amount') or '').strip())
+        except serializers.ValidationError as error:
+            raise InvalidRow(error.detail[0])
+
+        kind = (row.get('kind') or '').strip().lower() or (EXPENSE if amount < 0 else INCOME)
+        if kind == EXPENSE:
+            type_name = (row.get('type') or '').strip()
+            try:
+                frequency = int(row.get('frequency') or 0)
+            except ValueError:
+                raise InvalidRow('The frequency must be a whole number.')
+            return Expense(
+                name=name,
+                amount=abs(amount),
+                frequency=frequency,
+                type=self.get_type(type_name) if type_name else None,
+                user=self.user,
+            )
+        if kind == INCOME:
+            return Income(
+                name=name,
+                pay_amount=abs(amount),
+                pay_type=choice(PayType.labels, row.get('pay_type'), PayType.MONTHLY),
+                pay_day=choice(DayOfWeek.labels, row.get('pay_day'), None),
+                user=self.user,
+            )
+        raise InvalidRow('The kind must be {} or {}.'.format(EXPENSE, INCOME))
+
+    def add(self, number, row):
+        self.summary['rows'] += 1
+        try:
+            instance = self.instance(row)
+        except InvalidRow as error:
+            self.summary['errors'] += 1
+            if len(self.summary['error_rows']) < MAX_ERRORS:
+                self.summary['error_rows'].append({'row': number, 'error': str(error)})
+            return
+        (self.expenses if isinstance(instance, Expense) else self.incomes).append(instance)
+        if len(self.expenses) + len(self.incomes) >= self.chunk_size:
+            self.flush()
+
+    def flush(self):
+        # The types first since the expenses refer to them
+        Type.objects.bulk_create(self.new_types)
+        Expense.objects.bulk_create(self.expenses)
+        Income.objects.bulk_create(self.incomes)
+        self.summary['types'] += len(self.new_types)
+        self.summary['expenses'] += len(self.expenses)
+        self.summary['incomes'] += len(self.incomes)
+        self.new_types = []
+        self.expenses = []
+        self.incomes = []
+        if self.progress is not None:
+            self.progress(self.summary)
+
+    def run(self, rows):
+        """ Save all of rows in one transaction and return the summary """
+        with transaction.atomic(), batch_data_changes() as changed:
+            for number, row in rows:
+                self.add(number, row)
+            self.flush()
+            if self.summary['expenses'] or self.summary['incomes']:
+                # bulk_create() doesn't send post_save
+                changed.add(self.user.pk)
+        return self.summary
+
+
+def import_file(user, file, file_format, **kwargs):
+    """
+    Import a CSV or OFX file of bytes for user, kwargs are for Importer.
+    Raises InvalidFile if the file can't be read.
+    """
+    if file_format not in ROWS:
+        raise InvalidFile('The format must be one of {}.'.format(', '.join(FORMATS)))
+    try:
+        return Importer(user, **kwargs).run(ROWS[file_format](file))
+    except (UnicodeDecodeError, csv.Error) as error:
+        raise InvalidFile(str(error))
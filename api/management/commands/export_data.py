@@ -0,0 +1,55 @@
+import os
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from api import exporting
+
+
+class Command(BaseCommand):
+    help = 'Export all of a user\'s data as NDJSON or as a CSV file per model'
+
+    def add_arguments(self, parser):
+        parser.add_argument('username')
+        parser.add_argument('--format', choices=exporting.FORMATS, default='ndjson')
+        parser.add_argument(
+            '--output',
+            help='File for NDJSON, standard output by default, or directory for the CSV files',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=exporting.CHUNK_SIZE,
+            help='Rows read at a time',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            user = get_user_model().objects.get(username=options['username'])
+        except get_user_model().DoesNotExist:
+            raise CommandError('No user named "{}".'.format(options['username']))
+        chunk_size = options['chunk_size']
+        output = options['output']
+
+        if options['format'] == 'ndjson':
+            chunks = exporting.ndjson(user, chunk_size)
+            if output is None:
+                self.write(chunks, self.stdout)
+            else:
+                with open(output, 'w', newline='') as export:
+                    self.write(chunks, export)
+            return
+
+        if output is None:
+            raise CommandError('--output is required for CSV, the directory to write the files to.')
+        os.makedirs(output, exist_ok=True)
+        for name in exporting.MODELS:
+            path = os.path.join(output, name + '.csv')
+            with open(path, 'w', newline='') as export:
+                self.write(exporting.csv_file(user, name, chunk_size), export)
+            self.stderr.write('Wrote ' + path)
+
+    def write(self, chunks, output):
+        # Every chunk ends with a new line, self.stdout doesn't add another
+        for chunk in chunks:
+            output.write(chunk)
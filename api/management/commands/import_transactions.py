@@ -0,0 +1,55 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from api import importing
+
+
+class Command(BaseCommand):
+    help = 'Import expenses and incomes for a user from a CSV or OFX bank export'
+
+    def add_arguments(self, parser):
+        parser.add_argument('username')
+        parser.add_argument('path')
+        parser.add_argument(
+            '--format',
+            choices=importing.FORMATS,
+            help='Format of the file, by default from its extension',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=importing.CHUNK_SIZE,
+            help='Rows saved at a time',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            user = get_user_model().objects.get(username=options['username'])
+        except get_user_model().DoesNotExist:
+            raise CommandError('No user named "{}".'.format(options['username']))
+        file_format = options['format'] or importing.guess_format(options['path'])
+        if file_format is None:
+            raise CommandError('Use --format, the format can\'t be told from the file name.')
+
+        def progress(summary):
+            self.stdout.write('{rows} rows, {expenses} expenses, {incomes} incomes, {errors} errors'.format(**summary))
+
+        try:
+            with open(options['path'], 'rb') as lines:
+                summary = importing.import_file(
+                    user,
+                    lines,
+                    file_format,
+                    chunk_size=options['chunk_size'],
+                    progress=progress,
+                )
+        except OSError as error:
+            raise CommandError(error)
+        except importing.InvalidFile as error:
+            raise CommandError('Invalid file: {}'.format(error))
+
+        for error in summary['error_rows']:
+            self.stderr.write('Row {row}: {error}'.format(**error))
+        self.stdout.write(self.style.SUCCESS(
+            'Imported {expenses} expenses and {incomes} incomes, created {types} types'.format(**summary)
+        ))
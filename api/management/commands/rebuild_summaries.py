@@ -0,0 +1,60 @@
+import math
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from api.models import SUMMARY_FIELDS, FinancialSummary, User, rebuild_summary
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the users\' financial summaries from their data, or check them for drift'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user',
+            dest='username',
+            help='Only this user, all users by default',
+        )
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='Report summaries that differ from the data instead of rebuilding them',
+        )
+
+    def handle(self, *args, **options):
+        users = get_user_model().objects.order_by('pk')
+        if options['username'] is not None:
+            users = users.filter(username=options['username'])
+            if not users.exists():
+                raise CommandError('No user named "{}".'.format(options['username']))
+        user_ids = users.values_list('pk', flat=True)
+
+        if not options['check']:
+            count = 0
+            for user_id in user_ids.iterator():
+                rebuild_summary(user_id)
+                count += 1
+            self.stdout.write('Rebuilt {} summaries'.format(count))
+            return
+
+        summaries = FinancialSummary.objects.in_bulk(list(user_ids))
+        drifted = 0
+        for user_id in user_ids.iterator():
+            summary = summaries.get(user_id)
+            if summary is None:
+                self.stdout.write('User {}: no summary'.format(user_id))
+                drifted += 1
+                continue
+            totals = User(pk=user_id).get_financial_summary()
+            differences = [
+                '{} is {} but should be {}'.format(field, getattr(summary, field), totals[field])
+                for field in SUMMARY_FIELDS
+                # Income is a sum of floats, added up in a different order
+                if not math.isclose(getattr(summary, field), totals[field], rel_tol=1e-9, abs_tol=1e-6)
+            ]
+            if differences:
+                self.stdout.write('User {}: {}'.format(user_id, ', '.join(differences)))
+                drifted += 1
+        if drifted:
+            raise CommandError('{} summaries have drifted, run without --check to rebuild them.'.format(drifted))
+        self.stdout.write('All summaries are up to date')
@@ -0,0 +1,21 @@
+# Generated by Django 4.0.7 on 2026-10-18 18:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0002_data_version'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='creditcard',
+            index=models.Index(fields=['user', '-interest_rate', '-annual_fee'], name='creditcard_user_rate_fee'),
+        ),
+        migrations.AddIndex(
+            model_name='overdraft',
+            index=models.Index(fields=['user', 'monthly_fee'], name='overdraft_user_fee'),
+        ),
+    ]
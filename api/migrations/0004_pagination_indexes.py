@@ -0,0 +1,41 @@
+# Generated by Django 4.0.7 on 2026-10-18 18:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0003_debt_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='creditcard',
+            index=models.Index(fields=['user', 'date_created', 'id'], name='creditcard_user_created'),
+        ),
+        migrations.AddIndex(
+            model_name='expense',
+            index=models.Index(fields=['user', 'date_created', 'id'], name='expense_user_created'),
+        ),
+        migrations.AddIndex(
+            model_name='income',
+            index=models.Index(fields=['user', 'date_created', 'id'], name='income_user_created'),
+        ),
+        migrations.AddIndex(
+            model_name='investment',
+            index=models.Index(fields=['user', 'date_created', 'id'], name='investment_user_created'),
+        ),
+        migrations.AddIndex(
+            model_name='overdraft',
+            index=models.Index(fields=['user', 'date_created', 'id'], name='overdraft_user_created'),
+        ),
+        migrations.AddIndex(
+            model_name='taxbracket',
+            index=models.Index(fields=['user', 'date_created', 'id'], name='taxbracket_user_created'),
+        ),
+        migrations.AddIndex(
+            model_name='type',
+            index=models.Index(fields=['user', 'date_created', 'id'], name='type_user_created'),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 4.0.7 on 2026-10-18 18:59
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('api', '0004_pagination_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FinancialSummary',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='financial_summary', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('monthly_income', models.FloatField(default=0)),
+                ('monthly_expenses', models.BigIntegerField(default=0)),
+                ('minimum_payments', models.BigIntegerField(default=0)),
+                ('total_debt', models.BigIntegerField(default=0)),
+                ('money_after_expenses', models.FloatField(default=0)),
+            ],
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.0.7 on 2026-10-18 19:51
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0005_financial_summary'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='creditcard',
+            name='creditcard_user_rate_fee',
+        ),
+    ]
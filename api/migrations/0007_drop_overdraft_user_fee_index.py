@@ -0,0 +1,17 @@
+# Generated by Django 4.0.7 on 2026-10-18 20:36
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0006_drop_creditcard_rate_fee_index'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='overdraft',
+            name='overdraft_user_fee',
+        ),
+    ]
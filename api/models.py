@@ -1,14 +1,20 @@
+import threading
 import uuid
+from contextlib import contextmanager
 
 from django.conf import settings
 from django.contrib.auth.models import User as AuthUser
 from django.db import models
-from django.db.models.signals import post_save
+from django.db.models import Case, F, FloatField, OuterRef, Subquery, Sum, Value, When
+from django.db.models.functions import Cast, Coalesce
+from django.db.models.signals import post_delete, post_init, post_save, pre_delete
 from django.dispatch import receiver
 from django.urls import reverse
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 from rest_framework.authtoken.models import Token
 
+from api import amortization, authentication
 from api.utils import serialize_money
 
 
@@ -18,22 +24,53 @@ class User(AuthUser):
         proxy = True
 
     def get_total_monthly_income(self):
-        return sum([income.get_monthly_amount() for income in self.incomes.all()])
+        return self.incomes.aggregate(
+            total=Coalesce(Sum(Income.monthly_amount_expression()), Value(0.0)),
+        )['total']
 
     def get_expenses(self):
-        return sum([expense.amount for expense in self.expenses.all()])
+        return self.expenses.aggregate(total=Coalesce(Sum('amount'), 0))['total']
 
     def get_minimum_payments(self):
-        return sum([credit_card.min_payment for credit_card in self.credit_cards.all()])
+        return self.credit_cards.aggregate(total=Coalesce(Sum('min_payment'), 0))['total']
 
     def get_total_debt(self):
-        total = (sum([credit_card.balance for credit_card in self.credit_cards.all()])
-                + sum([overdraft.balance for overdraft in self.overdrafts.all()]))
-        return serialize_money(total)
+        return serialize_money(get_summary(self.pk).total_debt)
 
     def get_money_after_expenses(self):
         # monthly
-        return self.get_total_monthly_income() - self.get_expenses() - self.get_minimum_payments()
+        return get_summary(self.pk).money_after_expenses
+
+    def get_financial_summary(self):
+        """
+        Monthly income, expenses, minimum payments and total debt in one query,
+        calculated from all of the user's rows rather than read from FinancialSummary
+        """
+        def total(related, expression, default=0):
+            # Sum of the user's related rows as a subquery of the user
+            return Coalesce(
+                Subquery(
+                    related.objects.filter(user=OuterRef('pk'))
+                    .order_by()
+                    .values('user')
+                    .annotate(total=Sum(expression))
+                    .values('total')
+                ),
+                Value(default),
+            )
+
+        summary = AuthUser.objects.filter(pk=self.pk).values(
+            monthly_income=total(Income, Income.monthly_amount_expression(), 0.0),
+            monthly_expenses=total(Expense, 'amount'),
+            minimum_payments=total(CreditCard, 'min_payment'),
+            credit_card_debt=total(CreditCard, 'balance'),
+            overdraft_debt=total(Overdraft, 'balance'),
+        ).get()
+        summary['total_debt'] = summary.pop('credit_card_debt') + summary.pop('overdraft_debt')
+        summary['money_after_expenses'] = (
+            summary['monthly_income'] - summary['monthly_expenses'] - summary['minimum_payments']
+        )
+        return summary
 
 
 @receiver(post_save, sender=settings.AUTH_USER_MODEL)
@@ -42,6 +79,19 @@ def create_auth_token(sender, instance=None, created=False, **kwargs):
         Token.objects.create(user=instance)
 
 
+@receiver([post_save, post_delete], sender=Token)
+def token_changed(sender, instance, **kwargs):
+    # Regenerating deletes the old token and creates a new one
+    authentication.tokens.delete_user(instance.user_id)
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+@receiver(post_save, sender=User)
+def user_changed(sender, instance, **kwargs):
+    # Cached tokens have the user as it was, including is_active
+    authentication.tokens.delete_user(instance.pk)
+
+
 class Common(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     date_created = models.DateTimeField(auto_now_add=True)
@@ -49,6 +99,10 @@ class Common(models.Model):
 
     class Meta:
         abstract = True
+        indexes = [
+            # The user's rows in the order they are paginated, every subclass has a user
+            models.Index(fields=['user', 'date_created', 'id'], name='%(class)s_user_created'),
+        ]
 
 
 class DayOfWeek(models.IntegerChoices):
@@ -105,6 +159,21 @@ class Income(Common):
         # TODO: what to do about THIRTEEN_PAYS?
         return self.pay_amount
 
+    @staticmethod
+    def monthly_amount_expression():
+        """ get_monthly_amount() calculated by the database """
+        return F('pay_amount') * Case(
+            When(pay_type=PayType.WEEKLY, then=Value(52 / 12)),
+            When(pay_type=PayType.BIWEEKLY, then=Value(52 / 2 / 12)),
+            When(pay_type=PayType.SEMI_MONTHLY, then=Value(2.0)),
+            default=Value(1.0),
+            output_field=FloatField(),
+        )
+
+    def summary_values(self):
+        """ What it adds to the user's FinancialSummary """
+        return {'monthly_income': self.get_monthly_amount()}
+
 
 class Type(Common):
     name = models.TextField()
@@ -139,6 +208,10 @@ class Expense(Common):
         on_delete=models.CASCADE,
     )
 
+    def summary_values(self):
+        """ What it adds to the user's FinancialSummary """
+        return {'monthly_expenses': self.amount}
+
 
 class CreditCard(Common):
     name = models.TextField()
@@ -161,15 +234,47 @@ class CreditCard(Common):
         return reverse('creditcard-detail', kwargs={'pk': self.id})
 
     def to_JSON(self):
-        from api.serializers import CreditCardSerializer
-        return CreditCardSerializer(self).data
+        from api.serializers import DebtListSerializer
+        return DebtListSerializer([self]).data[0]
 
     def cost(self):
         """ Amount that it is costing each month """
         return self.balance * (self.interest_rate / (100 * 12)) + self.annual_fee / float(12)
 
-    def timeline(self, monthly_payment=None):
+    def summary_values(self):
+        """ What it adds to the user's FinancialSummary """
+        return {'minimum_payments': self.min_payment, 'total_debt': self.balance}
+
+    @staticmethod
+    def cost_expression():
+        """ cost() calculated by the database """
+        return (Cast('balance', FloatField()) * F('interest_rate') / (100 * 12)
+                + Cast('annual_fee', FloatField()) / 12)
+
+    @staticmethod
+    def rate_expression():
+        """ Monthly interest rate from terms() calculated by the database """
+        return F('interest_rate') / 100 / 12
+
+    def terms(self):
+        """ Monthly terms used to amortize the balance """
+        return amortization.Terms(
+            balance=self.balance,
+            rate=self.interest_rate / 100 / 12,
+            fee=self.annual_fee,
+            fee_interval=12,
+            min_payment=self.min_payment,
+            min_payment_percent=self.min_payment_percent,
+        )
+
+    def timeline(self, monthly_payment=None, method=amortization.CLOSED_FORM):
         """ Given a monthly payment how long will it take to pay off """
+        if method == amortization.LOOP:
+            return self._timeline_loop(monthly_payment)
+        return amortization.timeline(self.terms(), monthly_payment)
+
+    def _timeline_loop(self, monthly_payment=None):
+        """ Reference implementation of timeline() stepping one month at a time """
         amount = self.balance
         interest = 0
         points = []
@@ -202,7 +307,7 @@ class CreditCard(Common):
             'debt_per_month': points,
             'num_months': len(points),
             'total_interest_paid': total_interest,
-            'total_paid': serialize_money(total_paid),
+            'total_paid': serialize_money(round(total_paid)),
         }
 
 
@@ -225,21 +330,47 @@ class Overdraft(Common):
         return reverse('overdraft-detail', kwargs={'pk': self.id})
 
     def to_JSON(self):
-        return {
-            'id': str(self.id),
-            'name': self.name,
-            'interest_rate': self.interest_rate,
-            'balance': serialize_money(self.balance),
-            'monthly_fee': serialize_money(self.monthly_fee),
-            'type': 'overdraft'
-        }
+        from api.serializers import DebtListSerializer
+        return DebtListSerializer([self]).data[0]
 
     def cost(self):
         """ Amount that it is costing each month """
         return self.balance * (self.interest_rate / (100 * 12)) + self.monthly_fee
 
-    def timeline(self, monthly_payment):
+    def summary_values(self):
+        """ What it adds to the user's FinancialSummary """
+        return {'total_debt': self.balance}
+
+    @staticmethod
+    def cost_expression():
+        """ cost() calculated by the database """
+        return (Cast('balance', FloatField()) * F('interest_rate') / (100 * 12)
+                + Cast('monthly_fee', FloatField()))
+
+    @staticmethod
+    def rate_expression():
+        """ Monthly interest rate from terms() calculated by the database """
+        return F('interest_rate') / 100
+
+    def terms(self):
+        """ Monthly terms used to amortize the balance """
+        return amortization.Terms(
+            balance=self.balance,
+            rate=self.interest_rate / 100,
+            fee=self.monthly_fee,
+            fee_interval=1,
+            min_payment=0,
+            min_payment_percent=0,
+        )
+
+    def timeline(self, monthly_payment, method=amortization.CLOSED_FORM):
         """ Given a monthly payment how long will it take to pay off """
+        if method == amortization.LOOP:
+            return self._timeline_loop(monthly_payment)
+        return amortization.timeline(self.terms(), monthly_payment)
+
+    def _timeline_loop(self, monthly_payment):
+        """ Reference implementation of timeline() stepping one month at a time """
         amount = self.balance
         interest = 0
         points = []
@@ -268,7 +399,7 @@ class Overdraft(Common):
             'debt_per_month': points,
             'num_months': len(points),
             'total_interest_paid': total_interest,
-            'total_paid': serialize_money(total_paid),
+            'total_paid': serialize_money(round(total_paid)),
         }
 
 
@@ -311,3 +442,201 @@ class TaxBracket(Common):
     # def clean(self):
     #     if self.upper != 0 and self.upper < self.lower:
     #         raise ValidationError('The upper bound must be larger than the lower bound.')
+
+
+class DataVersion(models.Model):
+    """
+    Goes up every time any of a user's financial data changes,
+    so (user, version) identifies the state of that data.
+    """
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        related_name='data_version',
+        on_delete=models.CASCADE,
+        primary_key=True,
+    )
+    version = models.BigIntegerField(default=1)
+    date_updated = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return '{0} v{1}'.format(self.user_id, self.version)
+
+
+def get_data_version(user_id):
+    """ (version, date_updated) of the user's data, (0, None) before any changes """
+    row = DataVersion.objects.filter(user_id=user_id).values_list('version', 'date_updated').first()
+    return row or (0, None)
+
+
+def bump_data_version(user_id):
+    updated = DataVersion.objects.filter(user_id=user_id).update(
+        version=F('version') + 1,
+        date_updated=timezone.now(),
+    )
+    if not updated:
+        DataVersion.objects.get_or_create(user_id=user_id)
+
+
+@receiver(pre_delete, sender=settings.AUTH_USER_MODEL)
+@receiver(pre_delete, sender=User)
+def user_deleting(sender, instance, **kwargs):
+    # Their rows are deleted along with their data version and summary,
+    # which mustn't be created again for them
+    _deleting.user_ids = getattr(_deleting, 'user_ids', set()) | {instance.pk}
+
+
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+@receiver(post_delete, sender=User)
+def user_deleted(sender, instance, **kwargs):
+    _deleting.user_ids = getattr(_deleting, 'user_ids', set()) - {instance.pk}
+
+
+def being_deleted(user_id):
+    """ Whether the user is being deleted along with all of their rows """
+    return user_id in getattr(_deleting, 'user_ids', ())
+
+
+@receiver([post_save, post_delete], sender=CreditCard)
+@receiver([post_save, post_delete], sender=Expense)
+@receiver([post_save, post_delete], sender=Income)
+@receiver([post_save, post_delete], sender=Investment)
+@receiver([post_save, post_delete], sender=Overdraft)
+@receiver([post_save, post_delete], sender=TaxBracket)
+@receiver([post_save, post_delete], sender=Type)
+def data_changed(sender, instance, **kwargs):
+    if being_deleted(instance.user_id):
+        return
+    changed = getattr(_batch, 'user_ids', None)
+    if changed is None:
+        bump_data_version(instance.user_id)
+    else:
+        changed.add(instance.user_id)
+
+
+_batch = threading.local()
+_deleting = threading.local()
+
+
+@contextmanager
+def batch_data_changes():
+    """
+    Bump each changed user's data version and rebuild their summary once
+    at the end instead of for each saved or deleted row.
+
+    Yields the set of changed users' ids, add to it for changes that don't
+    send signals such as bulk_create().
+    """
+    if getattr(_batch, 'user_ids', None) is not None:
+        # Already batching
+        yield _batch.user_ids
+        return
+    _batch.user_ids = set()
+    try:
+        yield _batch.user_ids
+        user_ids = _batch.user_ids
+    finally:
+        _batch.user_ids = None
+    for user_id in user_ids:
+        bump_data_version(user_id)
+        rebuild_summary(user_id)
+
+
+class FinancialSummary(models.Model):
+    """
+    Totals of a user's financial data, kept up to date as it changes
+    so they don't need to be calculated from every row when read.
+    """
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        related_name='financial_summary',
+        on_delete=models.CASCADE,
+        primary_key=True,
+    )
+    monthly_income = models.FloatField(default=0)
+    monthly_expenses = models.BigIntegerField(default=0)
+    minimum_payments = models.BigIntegerField(default=0)
+    total_debt = models.BigIntegerField(default=0)
+    money_after_expenses = models.FloatField(default=0)
+
+    def __str__(self):
+        return 'Summary of {0}'.format(self.user_id)
+
+
+SUMMARY_FIELDS = ('monthly_income', 'monthly_expenses', 'minimum_payments', 'total_debt', 'money_after_expenses')
+
+
+def rebuild_summary(user_id):
+    """ Calculate the user's FinancialSummary from all of their rows """
+    totals = User(pk=user_id).get_financial_summary()
+    values = {field: totals[field] for field in SUMMARY_FIELDS}
+    if not FinancialSummary.objects.filter(user_id=user_id).update(**values):
+        FinancialSummary.objects.get_or_create(user_id=user_id, defaults=values)
+    return FinancialSummary(user_id=user_id, **values)
+
+
+def get_summary(user_id):
+    """ The user's FinancialSummary, built if they don't have one yet """
+    summary = FinancialSummary.objects.filter(user_id=user_id).first()
+    return summary or rebuild_summary(user_id)
+
+
+def update_summary(user_id, values, sign=1):
+    """ Add, or subtract with sign=-1, summary_values() to the user's FinancialSummary """
+    changes = dict(values)
+    changes['money_after_expenses'] = (
+        values.get('monthly_income', 0) - values.get('monthly_expenses', 0) - values.get('minimum_payments', 0)
+    )
+    changes = {field: F(field) + sign * change for field, change in changes.items() if change}
+    if changes:
+        # Without a summary there is nothing to update, get_summary() builds it from scratch
+        FinancialSummary.objects.filter(user_id=user_id).update(**changes)
+
+
+@receiver(post_init, sender=CreditCard)
+@receiver(post_init, sender=Expense)
+@receiver(post_init, sender=Income)
+@receiver(post_init, sender=Overdraft)
+def remember_summary_values(sender, instance, **kwargs):
+    # So saving it only updates the summary by the difference,
+    # not known when some of the fields weren't loaded
+    if instance.get_deferred_fields():
+        instance._summary_values = None
+        return
+    try:
+        instance._summary_values = (instance.user_id, instance.summary_values())
+    except TypeError:
+        # A new instance without all of its fields yet, such as
+        # Income(pay_type=PayType.WEEKLY) before its pay_amount is set.
+        # Its summary values are added when it is created
+        instance._summary_values = None
+
+
+@receiver(post_save, sender=CreditCard)
+@receiver(post_save, sender=Expense)
+@receiver(post_save, sender=Income)
+@receiver(post_save, sender=Overdraft)
+def summary_saved(sender, instance, created, **kwargs):
+    old = instance._summary_values
+    user_id, values = instance._summary_values = (instance.user_id, instance.summary_values())
+    if getattr(_batch, 'user_ids', None) is not None:
+        # Rebuilt at the end of the batch
+        return
+    if created:
+        update_summary(user_id, values)
+    elif old is None:
+        rebuild_summary(user_id)
+    elif old[0] == user_id:
+        update_summary(user_id, {field: value - old[1][field] for field, value in values.items()})
+    else:
+        update_summary(*old, sign=-1)
+        update_summary(user_id, values)
+
+
+@receiver(post_delete, sender=CreditCard)
+@receiver(post_delete, sender=Expense)
+@receiver(post_delete, sender=Income)
+@receiver(post_delete, sender=Overdraft)
+def summary_deleted(sender, instance, **kwargs):
+    if getattr(_batch, 'user_ids', None) is not None or being_deleted(instance.user_id):
+        return
+    update_summary(*(instance._summary_values or (instance.user_id, instance.summary_values())), sign=-1)
@@ -0,0 +1,65 @@
+"""
+Converting money between integer cents, as it is stored, and strings
+with a decimal point, as the API sends and receives it.
+
+Formatting looks the cents up in a table of ".00" to ".99" instead of
+slicing a string, and format_cents_many() formats a whole column in one
+comprehension. Parsing the usual "1234.56" drops the decimal point and
+reads the digits as one int rather than going through Decimal.
+"""
+import re
+
+# ".00" to ".99" by the cents
+CENTS = ['.{:02d}'.format(cents) for cents in range(100)]
+
+# Whether text is an amount with exactly two decimal places and nothing else
+with_cents = re.compile(r'-?[0-9]+\.[0-9][0-9]').fullmatch
+
+
+def format_cents(cents):
+    """ "12.34" for 1234, "-0.05" for -5 """
+    if cents < 0:
+        return '-' + str(-cents // 100) + CENTS[-cents % 100]
+    return str(cents // 100) + CENTS[cents % 100]
+
+
+def format_cents_many(values):
+    """ format_cents() of each of values, None stays None """
+    table = CENTS
+    return [
+        None if value is None
+        else str(value // 100) + table[value % 100] if value >= 0
+        else '-' + str(-value // 100) + table[-value % 100]
+        for value in values
+    ]
+
+
+def parse_cents(text):
+    """
+    Cents from a string with a decimal point, such as "12.34", "-5.5" or
+    ".99". Digits past the cents are dropped. ValueError if it isn't one.
+    """
+    if with_cents(text):
+        return int(text.replace('.', ''))
+    whole, point, fraction = text.strip().partition('.')
+    negative = whole.startswith('-')
+    if negative or whole.startswith('+'):
+        whole = whole[1:]
+    digits = whole + fraction
+    if not point or not digits or not (digits.isascii() and digits.isdigit()):
+        raise ValueError('Not an amount of money: {!r}'.format(text))
+    cents = int(whole or 0) * 100 + int((fraction + '00')[:2])
+    return -cents if negative else cents
+
+
+def parse_cents_many(texts):
+    """ parse_cents() of each of texts, None for those that aren't amounts """
+    match = with_cents
+    return [int(text.replace('.', '')) if match(text) else parse_or_none(text) for text in texts]
+
+
+def parse_or_none(text):
+    try:
+        return parse_cents(text)
+    except ValueError:
+        return None
@@ -0,0 +1,129 @@
+"""
+Keyset pagination for the list endpoints.
+
+Each page continues from the last row of the previous page with
+WHERE (date_created, id) > (last date_created, last id), which an index
+on (user, date_created, id) answers directly, so a page deep into the
+list costs the same as the first one, unlike OFFSET.
+"""
+import base64
+import binascii
+import json
+from collections import OrderedDict
+from types import SimpleNamespace
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, _positive_int
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Pages of `page_size` rows in `ordering` order with a link to the next page.
+
+    Subclass it to change the ordering or page size of an endpoint, or set
+    pagination_class = None on a ViewSet to return the whole list.
+    """
+    # Unique together, the last being unique on its own
+    ordering = ('date_created', 'id')
+    page_size = api_settings.PAGE_SIZE
+    page_size_query_param = 'page_size'
+    max_page_size = 1000
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.model = queryset.model
+        queryset = queryset.order_by(*self.ordering)
+
+        position = self.decode_cursor(request, queryset.model)
+        if position is not None:
+            queryset = queryset.filter(self.after(position))
+
+        # One more than the page to know if there is a next page
+        rows = list(queryset[:self.page_size + 1])
+        self.has_next = len(rows) > self.page_size
+        self.page = rows[:self.page_size]
+        return self.page
+
+    def after(self, position):
+        """ Rows after position in ordering, (a, b) > (x, y) as a filter """
+        condition = Q()
+        for index, name in reversed(list(enumerate(self.ordering))):
+            equal = Q(**dict(zip(self.ordering[:index], position)))
+            condition = (equal & Q(**{name + '__gt': position[index]})) | condition
+        if len(self.ordering) > 1:
+            # Redundant, but lets the database start reading the index at position
+            condition &= Q(**{self.ordering[0] + '__gte': position[0]})
+        return condition
+
+    def get_page_size(self, request):
+        try:
+            return _positive_int(
+                request.query_params[self.page_size_query_param],
+                strict=True,
+                cutoff=self.max_page_size,
+            )
+        except (KeyError, ValueError):
+            return self.page_size
+
+    def decode_cursor(self, request, model):
+        """ Values of ordering from the cursor, None on the first page """
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+        try:
+            values = json.loads(base64.urlsafe_b64decode(encoded.encode('ascii')))
+            if not isinstance(values, list) or len(values) != len(self.ordering):
+                raise ValueError
+            return [
+                model._meta.get_field(name).to_python(value)
+                for name, value in zip(self.ordering, values)
+            ]
+        except (TypeError, ValueError, UnicodeError, binascii.Error, DjangoValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, instance):
+        if isinstance(instance, dict):
+            # A row from .values()
+            instance = SimpleNamespace(**instance)
+        values = [
+            self.model._meta.get_field(name).value_to_string(instance)
+            for name in self.ordering
+        ]
+        return base64.urlsafe_b64encode(json.dumps(values).encode('ascii')).decode('ascii')
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.page[-1]))
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('results', data),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'next': {
+                    'type': 'string',
+                    'nullable': True,
+                },
+                'results': schema,
+            },
+        }
+
+
+class UserPagination(KeysetPagination):
+    """ Users are ordered by when they were created through their id """
+    ordering = ('id',)
@@ -0,0 +1,116 @@
+"""
+Fetching all of a user's debts, in the order to pay them off, with a
+single query.
+
+The priority of each debt is calculated by the database and the credit
+cards and overdrafts are combined with UNION so they can be ordered
+together.
+"""
+from django.db.models import F, FloatField, IntegerField, Value
+from django.db.models.functions import Cast
+
+from api.models import CreditCard, Overdraft
+
+
+# What the priority of a debt can be weighted by with ?weights=
+FACTORS = {
+    'cost': lambda model: model.cost_expression(),
+    'rate': lambda model: model.rate_expression(),
+    'balance': lambda model: Cast('balance', FloatField()),
+}
+
+# Weights of the named strategies, the debt with the highest priority is paid off first
+STRATEGIES = {
+    # Costing the most each month
+    'cost': {'cost': 1},
+    # Highest interest rate
+    'avalanche': {'rate': 1},
+    # Smallest balance
+    'snowball': {'balance': -1},
+}
+
+# Columns of either type of debt, the other type has NULL for them
+COLUMNS = (
+    'id',
+    'date_created',
+    'date_updated',
+    'name',
+    'interest_rate',
+    'balance',
+    'user_id',
+    'min_payment',
+    'min_payment_percent',
+    'annual_fee',
+    'monthly_fee',
+)
+
+# Debts with the same priority are ordered the same as before:
+# overdrafts by monthly_fee, then credit cards by interest rate and
+# annual fee, both highest first
+KINDS = (
+    (Overdraft, 0, F('monthly_fee'), Value(0)),
+    (CreditCard, 1, -F('interest_rate'), -F('annual_fee')),
+)
+
+
+def column_field(column):
+    """ An instance of the type of field column is for whichever type of debt has it """
+    for model, kind, first, second in KINDS:
+        for field in model._meta.concrete_fields:
+            if field.attname == column:
+                return type(field)()
+
+
+def priority(model, strategy):
+    """ Expression for the priority of model's debts, highest goes first """
+    weights = STRATEGIES[strategy] if isinstance(strategy, str) else strategy
+    factors = [
+        FACTORS[name](model) if weight == 1 else FACTORS[name](model) * weight
+        for name, weight in weights.items()
+    ]
+    return sum(factors[1:], factors[0])
+
+
+def debts_query(user, strategy='cost'):
+    """ Rows of (kind, *COLUMNS) for each of the user's debts in order """
+    queries = []
+    for model, kind, first, second in KINDS:
+        field_names = {field.attname for field in model._meta.concrete_fields}
+        # Both sides of the UNION select these in the same order
+        columns = {'debt_kind': Value(kind, IntegerField())}
+        for column in COLUMNS:
+            if column in field_names:
+                columns['debt_' + column] = F(column)
+            else:
+                columns['debt_' + column] = Value(None, column_field(column))
+        columns['debt_priority'] = priority(model, strategy)
+        columns['debt_first'] = Cast(first, FloatField())
+        columns['debt_second'] = Cast(second, FloatField())
+        queries.append(
+            model.objects.filter(user=user)
+            .annotate(**columns)
+            .values_list(*columns)
+            .order_by()
+        )
+    overdrafts, credit_cards = queries
+    return overdrafts.union(credit_cards, all=True).order_by(
+        '-debt_priority',
+        'debt_kind',
+        'debt_first',
+        'debt_second',
+    )
+
+
+def ordered_debts(user, strategy='cost'):
+    """ The user's credit cards and overdrafts in the order to pay them off """
+    # Positions in the row of each field, in the order from_db() expects them
+    fields = {}
+    for model, kind, first, second in KINDS:
+        field_names = [field.attname for field in model._meta.concrete_fields]
+        fields[kind] = (model, field_names, [COLUMNS.index(name) + 1 for name in field_names])
+    query = debts_query(user, strategy)
+    debts = []
+    for row in query:
+        model, field_names, positions = fields[row[0]]
+        debts.append(model.from_db(query.db, field_names, [row[position] for position in positions]))
+    return debts
@@ -1,4 +1,4 @@
-import decimal
+from operator import attrgetter
 
 from django.contrib.auth import get_user_model
 from rest_framework import serializers
@@ -14,7 +14,8 @@ from .models import (
     TaxBracket,
     Type,
 )
-from .utils import serialize_money
+from .money import format_cents, format_cents_many, parse_cents
+from .utils import detail_url_parts
 
 
 class RelatedUserSerializer(serializers.HyperlinkedModelSerializer):
@@ -32,18 +33,22 @@ class MoneyField(serializers.Field):
         """
         if not value:
             return value
-        return serialize_money(value)
-        
+        return format_cents(value)
+
+    def to_representation_many(self, values):
+        """ to_representation() of a whole column at once """
+        return [text if value else value for value, text in zip(values, format_cents_many(values))]
+
     def to_internal_value(self, value):
         """
         Convert string with decimal point
         to number of cents as an integer
         """
-        if '.' not in value:
+        if not isinstance(value, str) or '.' not in value:
             raise serializers.ValidationError('Must contain "." and decimal portion.')
         try:
-            return int(decimal.Decimal(value) * 100)
-        except decimal.InvalidOperation:
+            return parse_cents(value)
+        except ValueError:
             raise serializers.ValidationError('Invalid number.')
 
 
@@ -192,6 +197,90 @@ class OverdraftSerializer(serializers.ModelSerializer):
     def get_url(self, obj):
         return obj.get_absolute_url()
 
+
+def money(value):
+    """ The same as MoneyField.to_representation() """
+    if not value:
+        return value
+    return format_cents(value)
+
+
+# Keys of every serialized debt in order, None for those the type of debt doesn't have
+DEBT_FIELDS = (
+    'id',
+    'type',
+    'name',
+    'interest_rate',
+    'balance',
+    'min_payment',
+    'min_payment_percent',
+    'annual_fee',
+    'monthly_fee',
+    'url',
+)
+
+DEBT_MONEY_FIELDS = ('balance', 'min_payment', 'annual_fee', 'monthly_fee')
+
+# Value of 'type' and the detail view of each type of debt
+DEBT_TYPES = {
+    CreditCard: ('credit_card', 'creditcard-detail'),
+    Overdraft: ('overdraft', 'overdraft-detail'),
+}
+
+
+class DebtListSerializer:
+    """
+    Serializes a list of credit cards and overdrafts, in any mix, to dicts
+    with DEBT_FIELDS. How to get each field is worked out once per type
+    of debt rather than for every debt as ModelSerializer does.
+    """
+
+    def __init__(self, debts):
+        self.debts = debts
+
+    @staticmethod
+    def get_accessors(model):
+        """ Function for each of DEBT_FIELDS that gets it from one of model's debts """
+        name, view_name = DEBT_TYPES[model]
+        field_names = {field.attname for field in model._meta.concrete_fields}
+        prefix, suffix = detail_url_parts(view_name)
+
+        def constant(value):
+            return lambda debt: value
+
+        def money_field(field_name):
+            get = attrgetter(field_name)
+            return lambda debt: money(get(debt))
+
+        accessors = []
+        for field_name in DEBT_FIELDS:
+            if field_name == 'id':
+                accessor = lambda debt: str(debt.id)  # noqa: E731
+            elif field_name == 'type':
+                accessor = constant(name)
+            elif field_name == 'url':
+                accessor = lambda debt: prefix + str(debt.id) + suffix  # noqa: E731
+            elif field_name not in field_names:
+                accessor = constant(None)
+            elif field_name in DEBT_MONEY_FIELDS:
+                accessor = money_field(field_name)
+            else:
+                accessor = attrgetter(field_name)
+            accessors.append(accessor)
+        return accessors
+
+    @property
+    def data(self):
+        accessors = {}
+        serialized = []
+        for debt in self.debts:
+            model = type(debt)
+            if model not in accessors:
+                accessors[model] = self.get_accessors(model)
+            serialized.append(dict(zip(DEBT_FIELDS, [accessor(debt) for accessor in accessors[model]])))
+        return serialized
+
+
 class InvestmentSerializer(serializers.ModelSerializer):
     balance = MoneyField()
     user = serializers.HiddenField(
@@ -213,7 +302,10 @@ class TaxBracketSerializer(serializers.ModelSerializer):
         fields = ('id', 'lower', 'upper', 'tax_rate', 'group', 'user')
 
     def validate(self, data):
-        if data['upper'] != 0 and data['lower'] > data['upper']:
+        # Partial updates only have the fields being changed
+        lower = data.get('lower', getattr(self.instance, 'lower', None))
+        upper = data.get('upper', getattr(self.instance, 'upper', None))
+        if upper != 0 and lower > upper:
             raise serializers.ValidationError('The upper bound must be larger than the lower bound.')
         return data
 
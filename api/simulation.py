@@ -0,0 +1,300 @@
+"""
+Paying off all of a user's debts at the same time.
+
+The debts are held as parallel lists of balance, growth, fee and
+minimum payment so every debt is moved forward by one month in a
+single pass over the lists.
+
+In the events mode the months between events (a debt being paid off
+or an annual fee being charged) are skipped over with the closed-form
+segments from api.amortization, so the cost depends on the number of
+debts and fees rather than the number of months.
+"""
+from bisect import bisect_right
+from collections import namedtuple
+
+from api import downsampling
+from api.amortization import (
+    EPSILON,
+    MAX_MONTHS,
+    Segment,
+    first_month_below,
+    not_below,
+    segment_balance,
+)
+
+
+STEP = 'step'
+EVENTS = 'events'
+METHODS = (STEP, EVENTS)
+
+# `length` months starting at month `start` where each debt that is not
+# paid off follows one of segments
+Phase = namedtuple('Phase', ['start', 'length', 'segments'])
+
+
+class NotPaidOff(Exception):
+    pass
+
+
+class Simulation:
+    """
+    Debts, given in priority order, being paid off at the same time.
+
+    Each month the first debt that is not paid off gets payment (but
+    never less than its min_payment) and every other debt gets its
+    min_payment. Whatever is left over from paying off a debt goes
+    towards the next one that month, and its min_payment is added to
+    payment from then on.
+    """
+
+    def __init__(self, debts, payment):
+        terms = [debt.terms() for debt in debts]
+        self.payment = payment
+        self.balances = [term.balance for term in terms]
+        self.growths = [1 + term.rate for term in terms]
+        self.fees = [term.fee for term in terms]
+        self.fee_intervals = [term.fee_interval for term in terms]
+        self.min_payments = [term.min_payment for term in terms]
+
+        self.starting_debt = sum(balance for balance in self.balances if balance > 0)
+        self.active = [index for index, balance in enumerate(self.balances) if balance > 0]
+        self.month = 0
+
+    def payments(self):
+        """ Payment for each debt that is not paid off """
+        payments = [self.min_payments[index] for index in self.active]
+        payments[0] = max(self.payment, payments[0])
+        return payments
+
+    def check(self, total):
+        """ Raise NotPaidOff once the combined debt is not going down """
+        if self.active and total >= self.starting_debt * (1 - EPSILON):
+            raise NotPaidOff()
+        if self.month >= MAX_MONTHS:
+            raise NotPaidOff()
+
+    def step(self):
+        """ Move every debt forward one month, returns the combined debt """
+        month = self.month
+        owing = [
+            self.balances[index] * self.growths[index]
+            + (self.fees[index] if month % self.fee_intervals[index] == 0 else 0)
+            for index in self.active
+        ]
+        remaining = [amount - paid for amount, paid in zip(owing, self.payments())]
+
+        # Roll any overpayment into the next debts in priority order
+        surplus = -sum(amount for amount in remaining if amount < 0)
+        if surplus:
+            for position, amount in enumerate(remaining):
+                if amount <= 0:
+                    remaining[position] = 0
+                elif surplus:
+                    paid = min(surplus, amount)
+                    remaining[position] = amount - paid
+                    surplus -= paid
+
+        still_active = []
+        for index, amount in zip(self.active, remaining):
+            self.balances[index] = amount
+            if amount > 0:
+                still_active.append(index)
+            else:
+                self.payment += self.min_payments[index]
+        self.active = still_active
+        self.month += 1
+
+        total = sum(remaining)
+        self.check(total)
+        return total
+
+    def months_until_fee(self):
+        """ Months until an annual fee is charged, 0 if it is charged this month """
+        months = MAX_MONTHS - self.month
+        for index in self.active:
+            interval = self.fee_intervals[index]
+            if self.fees[index] and interval > 1:
+                offset = self.month % interval
+                months = min(months, interval - offset if offset else 0)
+        return months
+
+    def segments(self, length):
+        """ Closed-form segment for each debt that is not paid off """
+        return [
+            Segment(
+                start=self.month,
+                length=length,
+                balance=self.balances[index],
+                multiplier=self.growths[index],
+                # Fees charged every month are part of the constant
+                constant=paid - (self.fees[index] if self.fee_intervals[index] == 1 else 0),
+            )
+            for index, paid in zip(self.active, self.payments())
+        ]
+
+    def step_phase(self):
+        """ step() recorded as a one month Phase """
+        opening = [(index, self.balances[index]) for index in self.active]
+        start = self.month
+        self.step()
+        segments = []
+        for index, balance in opening:
+            owing = balance * self.growths[index]
+            # The constant is whatever was actually paid that month
+            segments.append(Segment(start, 1, balance, self.growths[index], owing - self.balances[index]))
+        return Phase(start, 1, segments)
+
+    def skip(self):
+        """
+        Move forward to the next event, returns the phases passed through.
+
+        Months without an event are skipped in closed form, the month of
+        an event is stepped through so overpayments roll over exactly.
+        """
+        limit = self.months_until_fee()
+        if limit == 0:
+            return [self.step_phase()]
+
+        segments = self.segments(limit)
+        if all(not_below(segment_balance(segment, 1), segment.balance) for segment in segments):
+            # No debt is going down
+            raise NotPaidOff()
+
+        paid_off = [first_month_below(segment, 0, limit) for segment in segments]
+        paid_off = [months for months in paid_off if months is not None]
+        if paid_off:
+            months = min(paid_off) - 1
+        elif limit == MAX_MONTHS - self.month:
+            raise NotPaidOff()
+        else:
+            months = limit
+
+        phases = []
+        if months:
+            phases.append(Phase(self.month, months, [segment._replace(length=months) for segment in segments]))
+            try:
+                for index, segment in zip(self.active, segments):
+                    self.balances[index] = segment_balance(segment, months)
+            except OverflowError:
+                raise NotPaidOff()
+            self.month += months
+            self.check(sum(self.balances[index] for index in self.active))
+        if paid_off:
+            phases.append(self.step_phase())
+        return phases
+
+
+def phase_balances(phases):
+    """ Combined debt at the end of each month of phases """
+    for phase in phases:
+        for months in range(1, phase.length + 1):
+            yield sum(segment_balance(segment, months) for segment in phase.segments)
+
+
+def simulate_phases(debts, payment):
+    """ Phases of paying off debts in the events mode, raises NotPaidOff """
+    simulation = Simulation(debts, payment)
+    phases = []
+    while simulation.active:
+        phases.extend(simulation.skip())
+    return phases
+
+
+def debt_at_months(phases, months):
+    """
+    Combined debt at the end of each of months, without going through
+    the months in between. Month 0 is the debt before any payments.
+    """
+    starts = [phase.start for phase in phases]
+    num_months = phases[-1].start + phases[-1].length if phases else 0
+    debts = {}
+    for month in months:
+        if month >= num_months:
+            debts[month] = 0
+        elif month <= 0:
+            debts[month] = sum(segment.balance for segment in phases[0].segments)
+        else:
+            phase = phases[bisect_right(starts, month - 1) - 1]
+            offset = month - phase.start
+            debts[month] = sum(segment_balance(segment, offset) for segment in phase.segments)
+    return debts
+
+
+def iter_debt_per_month(debts, payment, method=STEP):
+    """
+    Generator of the combined debt at the end of each month,
+    raises NotPaidOff when it is not going down.
+    """
+    simulation = Simulation(debts, payment)
+    if method == EVENTS:
+        while simulation.active:
+            yield from phase_balances(simulation.skip())
+    else:
+        while simulation.active:
+            yield simulation.step()
+
+
+def iter_points(debts, payment, method=STEP, resolution=1, max_points=None):
+    """
+    Generator of (month, debt) for every resolution months of the
+    timeline, reduced to max_points with downsampling.lttb().
+
+    The number of months is needed up front for max_points, so the
+    phases are simulated first and NotPaidOff is raised right away.
+    """
+    if max_points is None:
+        points = enumerate(iter_debt_per_month(debts, payment, method=method), 1)
+        return downsampling.every(points, resolution)
+    return phase_points(simulate_phases(debts, payment), resolution=resolution, max_points=max_points)
+
+
+def phase_points(phases, resolution=1, max_points=None):
+    """
+    Generator of (month, debt) for every resolution months of phases,
+    reduced to max_points with downsampling.lttb()
+    """
+    points = downsampling.every(enumerate(phase_balances(phases), 1), resolution)
+    if max_points is None:
+        return points
+    num_months = phases[-1].start + phases[-1].length if phases else 0
+    return downsampling.lttb(points, downsampling.every_length(num_months, resolution), max_points)
+
+
+def simulate(debts, payment, method=STEP, months=None, resolution=1, max_points=None):
+    """
+    Pay off debts, given in priority order, at the same time.
+
+    Returns the combined debt at the end of each month, only at each of
+    months when they are given, or as (month, debt) points when the
+    timeline is downsampled. num_months is -1 if the debt is never
+    paid off.
+    """
+    try:
+        if months is not None:
+            phases = simulate_phases(debts, payment)
+            num_months = phases[-1].start + phases[-1].length if phases else 0
+            return {
+                'num_months': num_months,
+                'debt_at_month': debt_at_months(phases, months),
+            }
+        if resolution != 1 or max_points is not None:
+            points = list(iter_points(
+                debts,
+                payment,
+                method=method,
+                resolution=resolution,
+                max_points=max_points,
+            ))
+            return {
+                'num_months': points[-1][0] if points else 0,
+                'points': points,
+            }
+        debt_per_month = list(iter_debt_per_month(debts, payment, method=method))
+    except NotPaidOff:
+        return {'num_months': -1}
+
+    return {
+        'num_months': len(debt_per_month),
+        'debt_per_month': debt_per_month,
+    }
@@ -1,7 +1,9 @@
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from rest_framework.authtoken.models import Token
 from rest_framework.test import APIClient, APITestCase
 
+from api.authentication import tokens
 from api.models import User
 
 
@@ -35,3 +37,6 @@ class APIBaseTest(APITestCase):
         # self.client is created before every test
         # This allows the tests to use self.client
         self.client = self.api_client
+        # Cached results are not rolled back with the database
+        cache.clear()
+        tokens.clear()
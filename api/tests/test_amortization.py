@@ -0,0 +1,72 @@
+from api.amortization import LOOP
+from api.models import CreditCard, Overdraft
+from api.tests.base import APIBaseTest
+
+
+class AmortizationTests(APIBaseTest):
+
+    def assertSameTimeline(self, debt, monthly_payment):
+        expected = debt.timeline(monthly_payment, method=LOOP)
+        timeline = debt.timeline(monthly_payment)
+        self.assertEqual(timeline['num_months'], expected['num_months'])
+        if expected['num_months'] == -1:
+            return
+        self.assertAlmostEqual(timeline['total_interest_paid'], expected['total_interest_paid'], places=4)
+        self.assertEqual(timeline['total_paid'], expected['total_paid'])
+        self.assertEqual(len(timeline['debt_per_month']), len(expected['debt_per_month']))
+        for balance, expected_balance in zip(timeline['debt_per_month'], expected['debt_per_month']):
+            self.assertAlmostEqual(balance, expected_balance, places=4)
+
+    def test_credit_card_monthly_payment(self):
+        card = CreditCard(
+            name='One',
+            interest_rate=19.99,
+            balance=25000_00,
+            min_payment=10_00,
+            min_payment_percent=10.0,
+            annual_fee=120_00,
+            user=self.user,
+        )
+        for monthly_payment in (10_00, 450_00, 451_00, 1000_00, 30000_00):
+            with self.subTest(monthly_payment=monthly_payment):
+                self.assertSameTimeline(card, monthly_payment)
+
+    def test_credit_card_min_payment_percent(self):
+        card = CreditCard(
+            name='One',
+            interest_rate=22.99,
+            balance=8000_00,
+            min_payment=25_00,
+            min_payment_percent=0.03,
+            annual_fee=99_00,
+            user=self.user,
+        )
+        self.assertSameTimeline(card, None)
+        card.annual_fee = 0
+        self.assertSameTimeline(card, None)
+        self.assertGreater(card.timeline()['num_months'], 12 * 10)
+
+    def test_credit_card_no_interest(self):
+        card = CreditCard(
+            name='One',
+            interest_rate=0,
+            balance=1000_00,
+            min_payment=30_00,
+            min_payment_percent=0,
+            annual_fee=0,
+            user=self.user,
+        )
+        self.assertSameTimeline(card, None)
+        self.assertEqual(card.timeline()['num_months'], 34)
+
+    def test_overdraft(self):
+        overdraft = Overdraft(
+            name='Over',
+            interest_rate=1.5,
+            balance=5000_00,
+            monthly_fee=5_00,
+            user=self.user,
+        )
+        for monthly_payment in (0, 80_00, 200_00, 6000_00):
+            with self.subTest(monthly_payment=monthly_payment):
+                self.assertSameTimeline(overdraft, monthly_payment)
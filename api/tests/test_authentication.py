@@ -0,0 +1,117 @@
+from collections import namedtuple
+
+from django.test import SimpleTestCase
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+
+from api.authentication import CachedTokenAuthentication, TokenCache, tokens
+from api.models import CreditCard
+from api.tests.base import APIBaseTest
+
+
+class CachedTokenAuthenticationTests(APIBaseTest):
+    url = reverse('creditcard-list')
+
+    def test_token_cached(self):
+        self.client.get(self.url)
+        with self.assertNumQueries(2):
+            # The data version and the credit cards
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+
+    def test_invalid_token(self):
+        self.client.credentials(HTTP_AUTHORIZATION='Token nonsense')
+        try:
+            response = self.client.get(self.url)
+            self.assertEqual(response.status_code, 401)
+        finally:
+            self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.token_key)
+
+    def test_deleted_token(self):
+        self.client.get(self.url)
+        Token.objects.filter(key=self.token_key).get().delete()
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 401)
+
+    def test_regenerated_token(self):
+        self.client.get(self.url)
+        Token.objects.get(key=self.token_key).delete()
+        token = Token.objects.create(user=self.user)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 401)
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + token.key)
+        try:
+            response = self.client.get(self.url)
+            self.assertEqual(response.status_code, 200)
+        finally:
+            self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.token_key)
+
+    def test_deactivated_user(self):
+        self.client.get(self.url)
+        self.user.is_active = False
+        self.user.save()
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 401)
+
+    def test_cached_user(self):
+        CreditCard.objects.create(
+            name='One',
+            interest_rate=20.0,
+            balance=1000_00,
+            min_payment=10_00,
+            min_payment_percent=10.0,
+            annual_fee=0,
+            user=self.user,
+        )
+        response = self.client.get(self.url)
+        self.assertEqual(len(response.json()['results']), 1)
+        self.assertEqual(tokens.get(self.token_key).user.pk, self.user.pk)
+        # The same user from the cache
+        response = self.client.get(self.url)
+        self.assertEqual(len(response.json()['results']), 1)
+
+    def test_copy_of_cached_user(self):
+        authentication = CachedTokenAuthentication()
+        user, token = authentication.authenticate_credentials(self.token_key)
+        user.first_name = 'Changed by one request'
+        other_user, other_token = authentication.authenticate_credentials(self.token_key)
+        self.assertEqual(other_user.pk, user.pk)
+        self.assertIsNot(other_user, user)
+        self.assertIsNot(other_token, token)
+        self.assertIs(other_token.user, other_user)
+        self.assertEqual(other_user.first_name, '')
+
+
+# Stands in for a Token
+Key = namedtuple('Key', ('key', 'user_id'))
+
+
+class TokenCacheTests(SimpleTestCase):
+
+    def setUp(self):
+        self.now = 0
+        self.cache = TokenCache(max_size=2, timeout=60, clock=lambda: self.now)
+
+    def test_least_recently_used_dropped(self):
+        for key in 'abc':
+            self.cache.set(Key(key, 1))
+            # Using a keeps it
+            self.cache.get('a')
+        self.assertIsNotNone(self.cache.get('a'))
+        self.assertIsNone(self.cache.get('b'))
+        self.assertIsNotNone(self.cache.get('c'))
+
+    def test_timeout(self):
+        self.cache.set(Key('a', 1))
+        self.now = 59
+        self.assertIsNotNone(self.cache.get('a'))
+        self.now = 60
+        self.assertIsNone(self.cache.get('a'))
+        self.assertEqual(len(self.cache.entries), 0)
+
+    def test_delete_user(self):
+        self.cache.set(Key('a', 1))
+        self.cache.set(Key('b', 2))
+        self.cache.delete_user(1)
+        self.assertIsNone(self.cache.get('a'))
+        self.assertIsNotNone(self.cache.get('b'))
@@ -0,0 +1,141 @@
+import math
+import uuid
+
+from django.db import connection
+from django.urls import reverse
+
+from api.models import Expense, TaxBracket, Type, bump_data_version, get_data_version
+from api.tests.base import APIBaseTest
+
+
+class BulkTests(APIBaseTest):
+    url = reverse('expense-bulk')
+
+    def create_expenses(self, count):
+        return Expense.objects.bulk_create(
+            Expense(name='Expense {}'.format(i), amount=100_00, user=self.user)
+            for i in range(count)
+        )
+
+    def test_bulk_create(self):
+        expense_type = Type.objects.create(name='Home', user=self.user)
+        version = get_data_version(self.user.pk)[0]
+        data = [
+            {'name': 'Rent', 'amount': '500.00', 'frequency': 1, 'type': str(expense_type.id)},
+            {'name': 'Food', 'amount': '300.00', 'frequency': 4},
+        ]
+        response = self.client.post(self.url, data, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual([expense['name'] for expense in response.json()], ['Rent', 'Food'])
+        expenses = Expense.objects.filter(user=self.user).order_by('-amount')
+        self.assertEqual([(expense.name, expense.amount) for expense in expenses], [('Rent', 500_00), ('Food', 300_00)])
+        self.assertEqual(expenses[0].type, expense_type)
+        self.assertEqual(get_data_version(self.user.pk)[0], version + 1)
+
+    def test_bulk_create_query_count(self):
+        bump_data_version(self.user.pk)
+        # Authenticate once so the token is cached
+        self.client.post(self.url, [], format='json')
+        fields = Expense._meta.concrete_fields
+        for count in (10, 1000):
+            with self.subTest(count=count):
+                data = [{'name': 'Expense', 'amount': '1.00'} for _ in range(count)]
+                # The database limits how many rows are inserted by each query
+                batch_size = connection.ops.bulk_batch_size(fields, [None] * count)
+                inserts = math.ceil(count / batch_size)
+                # Savepoint, inserts, data version, the totals, summary and release
+                with self.assertNumQueries(5 + inserts):
+                    response = self.client.post(self.url, data, format='json')
+                self.assertEqual(response.status_code, 201)
+
+    def test_bulk_create_errors_per_item(self):
+        data = [
+            {'name': 'Rent', 'amount': '500.00'},
+            {'name': 'Food', 'amount': '300'},
+            {'amount': '1.00'},
+        ]
+        response = self.client.post(self.url, data, format='json')
+        self.assertEqual(response.status_code, 400)
+        errors = response.json()
+        self.assertEqual(errors[0], {})
+        self.assertIn('amount', errors[1])
+        self.assertIn('name', errors[2])
+        self.assertFalse(Expense.objects.exists())
+
+    def test_bulk_requires_list(self):
+        for method in (self.client.post, self.client.patch, self.client.delete):
+            with self.subTest(method=method.__name__):
+                response = method(self.url, {'name': 'Rent'}, format='json')
+                self.assertEqual(response.status_code, 400)
+                response = method(self.url, [{}] * 1001, format='json')
+                self.assertEqual(response.status_code, 400)
+
+    def test_bulk_partial_update(self):
+        first, second = self.create_expenses(2)
+        version = get_data_version(self.user.pk)[0]
+        data = [
+            {'id': str(first.id), 'amount': '200.00'},
+            {'id': str(second.id), 'name': 'Renamed', 'frequency': 2},
+        ]
+        response = self.client.patch(self.url, data, format='json')
+        self.assertEqual(response.status_code, 200)
+        first.refresh_from_db()
+        second.refresh_from_db()
+        self.assertEqual((first.name, first.amount), ('Expense 0', 200_00))
+        self.assertEqual((second.name, second.amount, second.frequency), ('Renamed', 100_00, 2))
+        self.assertGreater(first.date_updated, first.date_created)
+        self.assertEqual(get_data_version(self.user.pk)[0], version + 1)
+
+    def test_bulk_partial_update_errors_per_item(self):
+        first, second = self.create_expenses(2)
+        other_user = self.user.__class__.objects.create_user(username='two', password='two')
+        other = Expense.objects.create(name='Other', amount=1_00, user=other_user)
+        data = [
+            {'id': str(first.id), 'amount': '200.00'},
+            {'id': str(second.id), 'amount': 'lots'},
+            {'id': str(other.id), 'amount': '1.00'},
+            {'id': 'nonsense'},
+            {'name': 'No id'},
+            {'id': str(first.id), 'name': 'Again'},
+        ]
+        response = self.client.patch(self.url, data, format='json')
+        self.assertEqual(response.status_code, 400)
+        errors = response.json()
+        self.assertEqual(errors[0], {})
+        self.assertIn('amount', errors[1])
+        self.assertEqual(errors[2], {'id': ['Not found.']})
+        self.assertEqual(errors[3], {'id': ['Must be a valid UUID.']})
+        self.assertEqual(errors[4], {'id': ['Must be a valid UUID.']})
+        self.assertEqual(errors[5], {'id': ['Repeated.']})
+        first.refresh_from_db()
+        self.assertEqual(first.amount, 100_00)
+
+    def test_bulk_partial_update_tax_brackets(self):
+        tax_bracket = TaxBracket.objects.create(lower=0, upper=100, tax_rate=15.0, group='Federal', user=self.user)
+        url = reverse('taxbracket-bulk')
+        response = self.client.patch(url, [{'id': str(tax_bracket.id), 'lower': 200}], format='json')
+        self.assertEqual(response.status_code, 400)
+        response = self.client.patch(url, [{'id': str(tax_bracket.id), 'lower': 50}], format='json')
+        self.assertEqual(response.status_code, 200)
+        tax_bracket.refresh_from_db()
+        self.assertEqual(tax_bracket.lower, 50)
+
+    def test_bulk_destroy(self):
+        expenses = self.create_expenses(5)
+        version = get_data_version(self.user.pk)[0]
+        response = self.client.delete(self.url, [str(expense.id) for expense in expenses[:3]], format='json')
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(
+            set(Expense.objects.values_list('id', flat=True)),
+            {expense.id for expense in expenses[3:]},
+        )
+        # Once for the whole batch
+        self.assertEqual(get_data_version(self.user.pk)[0], version + 1)
+
+    def test_bulk_destroy_errors_per_item(self):
+        expenses = self.create_expenses(2)
+        data = [str(expenses[0].id), str(uuid.uuid4()), 'nonsense']
+        response = self.client.delete(self.url, data, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), [{}, {'id': ['Not found.']}, {'id': ['Must be a valid UUID.']}])
+        self.assertEqual(Expense.objects.count(), 2)
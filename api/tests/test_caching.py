@@ -0,0 +1,69 @@
+from django.urls import reverse
+
+from api import caching
+from api.models import CreditCard, Expense, Income, PayType
+from api.tests.base import APIBaseTest
+
+
+class CachingTests(APIBaseTest):
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        Income.objects.create(
+            name='Job',
+            user=cls.user,
+            pay_amount=200_00,
+            pay_type=PayType.MONTHLY,
+        )
+        cls.credit_card = CreditCard.objects.create(
+            name='One',
+            interest_rate=20.0,
+            balance=1000_00,
+            min_payment=10_00,
+            min_payment_percent=10.0,
+            annual_fee=100_00,
+            user=cls.user,
+        )
+
+    def test_debts_cached(self):
+        url = reverse('get-debts')
+        self.client.get(url)
+        self.assertEqual(caching.stats(), {'hits': 0, 'misses': 1})
+        with self.assertNumQueries(1):
+            # Only the data version is looked up, the token is cached
+            response = self.client.get(url)
+        self.assertEqual(response.json()[0]['name'], 'One')
+        self.assertEqual(caching.stats(), {'hits': 1, 'misses': 1})
+
+    def test_debts_invalidated(self):
+        url = reverse('get-debts')
+        self.client.get(url)
+        self.credit_card.name = 'Renamed'
+        self.credit_card.save()
+        response = self.client.get(url)
+        self.assertEqual(response.json()[0]['name'], 'Renamed')
+        self.assertEqual(caching.stats(), {'hits': 0, 'misses': 2})
+
+        self.credit_card.delete()
+        response = self.client.get(url)
+        self.assertEqual(response.json(), [])
+
+    def test_timeline_invalidated(self):
+        url = reverse('get-timeline')
+        self.assertEqual(self.client.get(url).json()['num_months'], 7)
+        self.assertEqual(self.client.get(url).json()['num_months'], 7)
+        self.assertEqual(caching.stats(), {'hits': 1, 'misses': 1})
+
+        # Less money to pay off the debt
+        Expense.objects.create(name='Rent', amount=50_00, user=self.user)
+        self.assertGreater(self.client.get(url).json()['num_months'], 7)
+
+    def test_timeline_cached_per_query(self):
+        url = reverse('get-timeline')
+        self.client.get(url)
+        self.client.get(url, {'resolution': 'quarterly'})
+        self.client.get(url, {'months': '1,2'})
+        self.assertEqual(caching.stats(), {'hits': 0, 'misses': 3})
+        self.client.get(url, {'resolution': 'quarterly'})
+        self.assertEqual(caching.stats(), {'hits': 1, 'misses': 3})
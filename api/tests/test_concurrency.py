@@ -0,0 +1,218 @@
+import asyncio
+import json
+import threading
+import time
+from unittest import mock
+
+from asgiref.sync import async_to_sync, sync_to_async
+from asgiref.testing import ApplicationCommunicator
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import AsyncRequestFactory, TransactionTestCase, override_settings
+from django.urls import resolve, reverse
+from rest_framework.authtoken.models import Token
+
+from api import concurrency
+from api.authentication import tokens
+from api.models import CreditCard, Income, PayType
+from api.tests.base import APIBaseTest
+from debt.asgi import application
+
+
+@mock.patch('api.concurrency.POLL_INTERVAL', 0.05)
+class AsyncViewTests(APIBaseTest):
+    url = reverse('creditcard-list')
+
+    def create_card(self):
+        return CreditCard.objects.create(
+            name='One',
+            interest_rate=20.0,
+            balance=1000_00,
+            min_payment=10_00,
+            min_payment_percent=10.0,
+            annual_fee=0,
+            user=self.user,
+        )
+
+    def test_views_are_async(self):
+        card = self.create_card()
+        urls = [reverse(name) for name in ('api-root', 'creditcard-list', 'get-debts', 'get-timeline')]
+        for url in urls + [card.get_absolute_url()]:
+            with self.subTest(url=url):
+                self.assertTrue(asyncio.iscoroutinefunction(resolve(url, settings.ASGI_URLCONF).func))
+                # Only under ASGI
+                self.assertFalse(asyncio.iscoroutinefunction(resolve(url).func))
+
+    async def async_get(self, url, data=None, **headers):
+        """ GET through the ASGI handler, its headers are named without HTTP_ """
+        return await self.async_client.get(url, data, AUTHORIZATION='Token ' + self.token_key, **headers)
+
+    async def test_wait_unchanged(self):
+        etag = (await self.async_get(self.url))['ETag']
+        start = time.monotonic()
+        response = await self.async_get(self.url, {'wait': '0.2'}, IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertGreaterEqual(time.monotonic() - start, 0.2)
+
+    async def test_wait_already_changed(self):
+        etag = (await self.async_get(self.url))['ETag']
+        await sync_to_async(self.create_card)()
+        start = time.monotonic()
+        response = await self.async_get(self.url, {'wait': '30'}, IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertLess(time.monotonic() - start, 5)
+
+    def test_wait_ignored_under_wsgi(self):
+        etag = self.client.get(self.url)['ETag']
+        for wait in ('30', 'soon'):
+            with self.subTest(wait=wait):
+                start = time.monotonic()
+                response = self.client.get(self.url, {'wait': wait}, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, 304)
+                self.assertLess(time.monotonic() - start, 5)
+
+    def test_wait_for_change(self):
+        etag = self.client.get(self.url)['ETag']
+        request = AsyncRequestFactory().get(
+            self.url,
+            {'wait': '30'},
+            IF_NONE_MATCH=etag,
+            AUTHORIZATION='Token ' + self.token_key,
+        )
+        view = resolve(self.url, settings.ASGI_URLCONF).func
+
+        async def change_later():
+            await asyncio.sleep(0.1)
+            await sync_to_async(self.create_card)()
+
+        async def poll_and_change():
+            response, changed = await asyncio.gather(view(request), change_later())
+            return response
+
+        start = time.monotonic()
+        response = async_to_sync(poll_and_change)()
+        self.assertEqual(response.status_code, 200)
+        self.assertLess(time.monotonic() - start, 5)
+        response.render()
+        self.assertEqual(len(response.data['results']), 1)
+
+    async def test_invalid_wait(self):
+        for wait in ('soon', '-1', '61'):
+            with self.subTest(wait=wait):
+                response = await self.async_get(self.url, {'wait': wait})
+                self.assertEqual(response.status_code, 400)
+                self.assertIn('wait', response.json())
+
+    async def test_wait_unauthenticated(self):
+        response = await self.async_client.get(self.url, {'wait': '30'}, IF_NONE_MATCH='W/"1-1-json"')
+        self.assertEqual(response.status_code, 401)
+
+    def test_writes(self):
+        # ?wait= is only for reads
+        response = self.client.post(self.url + '?wait=soon', {
+            'name': 'Two',
+            'interest_rate': 20.0,
+            'balance': '10.00',
+            'min_payment': '1.00',
+            'min_payment_percent': 10.0,
+            'annual_fee': '0.00',
+        }, format='json')
+        self.assertEqual(response.status_code, 201)
+
+
+class SimulationPoolTests(APIBaseTest):
+
+    def tearDown(self):
+        if concurrency.simulation_pool is not None:
+            concurrency.simulation_pool.shutdown()
+            concurrency.simulation_pool = None
+        super().tearDown()
+
+    def test_same_timeline(self):
+        Income.objects.create(name='Job', pay_amount=200_00, pay_type=PayType.MONTHLY, user=self.user)
+        CreditCard.objects.create(
+            name='One',
+            interest_rate=20.0,
+            balance=1000_00,
+            min_payment=10_00,
+            min_payment_percent=10.0,
+            annual_fee=100_00,
+            user=self.user,
+        )
+        url = reverse('get-timeline')
+        expected = self.client.get(url).json()
+        # So it is simulated again
+        cache.clear()
+        with override_settings(SIMULATION_PROCESSES=1):
+            response = self.client.get(url)
+        self.assertIsNotNone(concurrency.simulation_pool)
+        self.assertEqual(response.json(), expected)
+
+    def test_threads(self):
+        # Not the thread of the view, which sync_to_async() shares between requests
+        thread = concurrency.run_simulation(threading.get_ident)
+        self.assertNotEqual(thread, threading.get_ident())
+
+
+class ASGIStreamingTests(TransactionTestCase):
+    """ Streaming responses through debt.asgi, which reads them in a thread """
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        tokens.clear()
+        self.user = get_user_model().objects.create_user(username='one', password='one')
+        self.token_key = Token.objects.get(user=self.user).key
+        Income.objects.create(name='Job', pay_amount=115_00, pay_type=PayType.MONTHLY, user=self.user)
+        CreditCard.objects.create(
+            name='One',
+            interest_rate=5.0,
+            balance=20000_00,
+            min_payment=25_00,
+            min_payment_percent=0.03,
+            annual_fee=0,
+            user=self.user,
+        )
+
+    async def get(self, path, query_string=b''):
+        """ (status, headers, body) of a GET request to debt.asgi.application """
+        communicator = ApplicationCommunicator(application, {
+            'type': 'http',
+            'asgi': {'version': '3.0'},
+            'http_version': '1.1',
+            'method': 'GET',
+            'scheme': 'http',
+            'path': path,
+            'query_string': query_string,
+            'root_path': '',
+            'headers': [
+                (b'host', b'testserver'),
+                (b'authorization', 'Token {}'.format(self.token_key).encode('ascii')),
+            ],
+            'client': ('127.0.0.1', 0),
+            'server': ('testserver', 80),
+        })
+        await communicator.send_input({'type': 'http.request'})
+        start = await communicator.receive_output(10)
+        body = b''
+        while True:
+            message = await communicator.receive_output(10)
+            body += message.get('body', b'')
+            if not message.get('more_body'):
+                break
+        await communicator.wait()
+        return start['status'], dict(start['headers']), body
+
+    async def test_export(self):
+        status, headers, body = await self.get(reverse('export-data'))
+        self.assertEqual(status, 200)
+        records = [json.loads(line) for line in body.decode().splitlines()]
+        self.assertEqual([record['model'] for record in records], ['incomes', 'credit_cards'])
+
+    async def test_streamed_timeline(self):
+        status, headers, body = await self.get(reverse('get-timeline'), b'stream=true')
+        self.assertEqual(status, 200)
+        timeline = json.loads(body)
+        self.assertGreater(timeline['num_months'], 512)
+        self.assertEqual(len(timeline['debt_per_month']), timeline['num_months'])
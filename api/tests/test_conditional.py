@@ -0,0 +1,108 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.http import http_date
+
+from api.models import DataVersion, Overdraft
+from api.tests.base import APIBaseTest
+
+
+class ConditionalGetTests(APIBaseTest):
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.overdraft = Overdraft.objects.create(
+            name='Over',
+            interest_rate=20.0,
+            balance=1000_00,
+            monthly_fee=9_00,
+            user=cls.user,
+        )
+
+    def test_not_modified(self):
+        urls = (
+            (reverse('overdraft-list'), 1),
+            # The row is looked up first so other users' rows are 404
+            (reverse('overdraft-detail', kwargs={'pk': self.overdraft.pk}), 2),
+            (reverse('expense-list'), 1),
+            (reverse('get-debts'), 1),
+            (reverse('get-timeline'), 1),
+        )
+        for url, queries in urls:
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, 200)
+                etag = response['ETag']
+                with self.assertNumQueries(queries):
+                    # Only the data version is looked up, the token is cached
+                    response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, 304)
+
+    def test_errors_before_not_modified(self):
+        other = get_user_model().objects.create_user(username='two', password='two')
+        overdraft = Overdraft.objects.create(
+            name='Over',
+            interest_rate=20.0,
+            balance=1000_00,
+            monthly_fee=9_00,
+            user=other,
+        )
+        etag = self.client.get(reverse('overdraft-list'))['ETag']
+        requests = (
+            (reverse('overdraft-detail', kwargs={'pk': overdraft.pk}), {}, 404),
+            (reverse('overdraft-list'), {'fields': 'nope'}, 400),
+            (reverse('overdraft-list'), {'cursor': 'nope'}, 404),
+            (reverse('get-debts'), {'strategy': 'nope'}, 400),
+            (reverse('get-timeline'), {'method': 'nope'}, 400),
+        )
+        for url, params, status_code in requests:
+            with self.subTest(url=url, params=params):
+                response = self.client.get(url, params, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, status_code)
+
+    def age_data_version(self):
+        """ As if the last change was 2 seconds ago """
+        DataVersion.objects.filter(user=self.user).update(date_updated=timezone.now() - timedelta(seconds=2))
+
+    def test_modified(self):
+        url = reverse('overdraft-list')
+        self.age_data_version()
+        response = self.client.get(url)
+        etag = response['ETag']
+        last_modified = response['Last-Modified']
+
+        self.overdraft.balance = 500_00
+        self.overdraft.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['results'][0]['balance'], '500.00')
+        self.assertNotEqual(response['ETag'], etag)
+
+        response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, 200)
+
+        self.age_data_version()
+        response = self.client.get(url)
+        response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        self.assertEqual(response.status_code, 304)
+
+    def test_modified_in_same_second(self):
+        url = reverse('overdraft-list')
+        self.overdraft.save()
+        changed = DataVersion.objects.get(user=self.user).date_updated.timestamp()
+        # Still the second of the change
+        with mock.patch('api.conditional.time.time', return_value=changed):
+            response = self.client.get(url)
+            self.assertFalse(response.has_header('Last-Modified'))
+            # Another change could come in the same second
+            response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=http_date(changed))
+            self.assertEqual(response.status_code, 200)
+
+    def test_errors_have_no_etag(self):
+        response = self.client.get(reverse('get-timeline'), {'method': 'fast'})
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(response.has_header('ETag'))
@@ -64,7 +64,7 @@ class CreditCardTests(APIBaseTest):
     def test_get_list(self):
         response = self.client.get(self.list_url)
         expected = CreditCardSerializer(self.credit_card).data
-        credit_card_from_response = json.loads(response.content)[0]
+        credit_card_from_response = json.loads(response.content)['results'][0]
         self.assertEqual(
             credit_card_from_response,
             expected
@@ -0,0 +1,93 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.urls import reverse
+
+from api.models import (
+    CreditCard,
+    DataVersion,
+    Expense,
+    FinancialSummary,
+    Income,
+    Overdraft,
+    PayType,
+    TaxBracket,
+    Type,
+    batch_data_changes,
+    being_deleted,
+    get_data_version,
+    get_summary,
+)
+from api.tests.base import APIBaseTest
+
+
+class DataVersionTests(APIBaseTest):
+
+    def version(self):
+        return get_data_version(self.user.pk)[0]
+
+    def test_no_changes(self):
+        self.assertEqual(get_data_version(self.user.pk), (0, None))
+
+    def test_writes_bump_version(self):
+        data = {
+            'lower': 0,
+            'upper': 50000,
+            'tax_rate': 15.0,
+            'group': 'federal',
+        }
+        response = self.client.post(reverse('taxbracket-list'), data, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(self.version(), 1)
+
+        url = reverse('taxbracket-detail', kwargs={'pk': response.json()['id']})
+        response = self.client.put(url, dict(data, tax_rate=20.5), format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.version(), 2)
+
+        response = self.client.delete(url)
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(self.version(), 3)
+        self.assertIsNotNone(get_data_version(self.user.pk)[1])
+
+    def test_invalid_write_does_not_bump_version(self):
+        data = {
+            'lower': 100,
+            'upper': 50,
+            'tax_rate': 15.0,
+            'group': 'federal',
+        }
+        response = self.client.post(reverse('taxbracket-list'), data, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.version(), 0)
+        self.assertFalse(TaxBracket.objects.exists())
+
+    def test_delete_user_with_data(self):
+        user = get_user_model().objects.create_user(username='two', password='two')
+        food = Type.objects.create(name='Food', user=user)
+        Expense.objects.create(name='Lunch', amount=10_00, type=food, user=user)
+        Income.objects.create(name='Job', pay_amount=500_00, pay_type=PayType.MONTHLY, user=user)
+        CreditCard.objects.create(
+            name='One',
+            interest_rate=20.0,
+            balance=1000_00,
+            min_payment=10_00,
+            min_payment_percent=10.0,
+            annual_fee=0,
+            user=user,
+        )
+        Overdraft.objects.create(name='Over', interest_rate=1.0, balance=100_00, monthly_fee=0, user=user)
+        TaxBracket.objects.create(lower=0, upper=0, tax_rate=15.0, group='single', user=user)
+        get_summary(user.pk)
+        other = get_user_model().objects.create_user(username='three', password='three')
+        Type.objects.create(name='Food', user=other)
+
+        user.delete()
+        with batch_data_changes():
+            other.delete()
+        # The rows deleted along with the users mustn't leave anything pointing at them
+        connection.check_constraints()
+        for user_id in (user.pk, other.pk):
+            self.assertFalse(DataVersion.objects.filter(user_id=user_id).exists())
+            self.assertFalse(FinancialSummary.objects.filter(user_id=user_id).exists())
+        # Their ids aren't remembered after they are deleted
+        self.assertFalse(being_deleted(user.pk))
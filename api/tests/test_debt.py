@@ -1,8 +1,10 @@
 import json
+from unittest import mock
 
 from django.urls import reverse
 
-from api.models import CreditCard, Income, Overdraft, PayType
+from api import simulation
+from api.models import CreditCard, Expense, Income, Overdraft, PayType
 from api.utils import serialize_money
 from .base import APIBaseTest
 
@@ -142,6 +144,51 @@ class DebtTests(APIBaseTest):
             [card.to_JSON(), overdraft.to_JSON()],
         )
 
+    def test_debts_same_shape(self):
+        card = CreditCard.objects.create(
+            name='One',
+            interest_rate=20.0,
+            balance=1000_00,
+            min_payment=10_00,
+            min_payment_percent=10.0,
+            annual_fee=0,
+            user=self.user,
+        )
+        overdraft = Overdraft.objects.create(
+            name='Over',
+            interest_rate=21.0,
+            balance=1000_00,
+            monthly_fee=5_00,
+            user=self.user,
+        )
+        response = self.client.get(self.url)
+        self.assertEqual(response.json(), [
+            {
+                'id': str(overdraft.id),
+                'type': 'overdraft',
+                'name': 'Over',
+                'interest_rate': 21.0,
+                'balance': '1000.00',
+                'min_payment': None,
+                'min_payment_percent': None,
+                'annual_fee': None,
+                'monthly_fee': '5.00',
+                'url': reverse('overdraft-detail', kwargs={'pk': overdraft.id}),
+            },
+            {
+                'id': str(card.id),
+                'type': 'credit_card',
+                'name': 'One',
+                'interest_rate': 20.0,
+                'balance': '1000.00',
+                'min_payment': '10.00',
+                'min_payment_percent': 10.0,
+                'annual_fee': 0,
+                'monthly_fee': None,
+                'url': reverse('creditcard-detail', kwargs={'pk': card.id}),
+            },
+        ])
+
     def test_timeline_with_credit_card(self):
         Income.objects.create(
             name='Job',
@@ -189,7 +236,42 @@ class DebtTests(APIBaseTest):
         url = reverse('get-timeline')
         response = self.client.get(url)
         self.assertEqual(response.status_code, 200)
-        self.assertEqual(json.loads(response.content)['num_months'], 4)
+        # The credit card is paid down by its min_payment
+        # while the overdraft is being paid off
+        timeline = json.loads(response.content)
+        self.assertEqual(timeline['num_months'], 3)
+        debt_per_month = timeline['debt_per_month']
+        self.assertEqual(len(debt_per_month), 3)
+        # 219_00 left on the overdraft and 1106_66.67 on the credit card
+        self.assertAlmostEqual(debt_per_month[0], 219_00 + 1106_66.67, places=0)
+        self.assertEqual(debt_per_month[-1], 0)
+
+    def test_timeline_many_credit_cards(self):
+        Income.objects.create(
+            name='Job',
+            user=self.user,
+            pay_amount=2000_00,
+            pay_type=PayType.SEMI_MONTHLY,
+        )
+        for index in range(25):
+            CreditCard.objects.create(
+                name='Card {}'.format(index),
+                interest_rate=10.0 + index,
+                balance=1000_00 + index * 100_00,
+                min_payment=25_00,
+                min_payment_percent=0.03,
+                annual_fee=index * 2_00,
+                user=self.user,
+            )
+        url = reverse('get-timeline')
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        timeline = json.loads(response.content)
+        self.assertEqual(timeline['num_months'], len(timeline['debt_per_month']))
+        self.assertGreater(timeline['num_months'], 12)
+        self.assertEqual(timeline['debt_per_month'][-1], 0)
+        # Combined debt goes down every month
+        self.assertEqual(timeline['debt_per_month'], sorted(timeline['debt_per_month'], reverse=True))
 
     def test_timeline_cannot_reduce_debt(self):
         Income.objects.create(
@@ -218,3 +300,291 @@ class DebtTests(APIBaseTest):
         response = self.client.get(url)
         self.assertEqual(response.status_code, 200)
         self.assertEqual(json.loads(response.content)['num_months'], -1)
+
+    def test_timeline_events_same_as_step(self):
+        Income.objects.create(
+            name='Job',
+            user=self.user,
+            pay_amount=1200_00,
+            pay_type=PayType.BIWEEKLY,
+        )
+        for index in range(5):
+            CreditCard.objects.create(
+                name='Card {}'.format(index),
+                interest_rate=15.0 + index,
+                balance=5000_00 + index * 1000_00,
+                min_payment=50_00,
+                min_payment_percent=0.03,
+                annual_fee=index * 30_00,
+                user=self.user,
+            )
+        Overdraft.objects.create(
+            name='Over',
+            interest_rate=1.5,
+            balance=800_00,
+            monthly_fee=5_00,
+            user=self.user,
+        )
+        url = reverse('get-timeline')
+        step = self.client.get(url).json()
+        response = self.client.get(url, {'method': 'events'})
+        self.assertEqual(response.status_code, 200)
+        events = response.json()
+        self.assertGreater(step['num_months'], 12)
+        self.assertEqual(events['num_months'], step['num_months'])
+        for balance, expected in zip(events['debt_per_month'], step['debt_per_month']):
+            self.assertAlmostEqual(balance, expected, places=4)
+
+    def test_timeline_invalid_method(self):
+        url = reverse('get-timeline')
+        response = self.client.get(url, {'method': 'fast'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_timeline_debt_at_months(self):
+        Income.objects.create(
+            name='Job',
+            user=self.user,
+            pay_amount=150_00,
+            pay_type=PayType.WEEKLY,
+        )
+        for index in range(3):
+            CreditCard.objects.create(
+                name='Card {}'.format(index),
+                interest_rate=19.99,
+                balance=4000_00 + index * 500_00,
+                min_payment=40_00,
+                min_payment_percent=0.03,
+                annual_fee=index * 50_00,
+                user=self.user,
+            )
+        url = reverse('get-timeline')
+        timeline = self.client.get(url).json()
+        debt_per_month = timeline['debt_per_month']
+
+        response = self.client.get(url, {'months': '0,1,12,24,600'})
+        self.assertEqual(response.status_code, 200)
+        debt_at_month = response.json()['debt_at_month']
+        self.assertEqual(response.json()['num_months'], timeline['num_months'])
+        self.assertEqual(debt_at_month['0'], 13500_00)
+        self.assertAlmostEqual(debt_at_month['1'], debt_per_month[0], places=4)
+        self.assertAlmostEqual(debt_at_month['12'], debt_per_month[11], places=4)
+        self.assertAlmostEqual(debt_at_month['24'], debt_per_month[23], places=4)
+        self.assertEqual(debt_at_month['600'], 0)
+
+        response = self.client.get(url, {'month': '12'})
+        self.assertEqual(list(response.json()['debt_at_month']), ['12'])
+
+    def test_timeline_invalid_months(self):
+        url = reverse('get-timeline')
+        for months in ('', 'a', '12,,24', '-1'):
+            with self.subTest(months=months):
+                response = self.client.get(url, {'months': months})
+                self.assertEqual(response.status_code, 400)
+
+    def test_timeline_stream(self):
+        self.create_long_timeline()
+        url = reverse('get-timeline')
+        expected = self.client.get(url).json()
+        for method in ('step', 'events'):
+            with self.subTest(method=method):
+                response = self.client.get(url, {'stream': 'true', 'method': method})
+                self.assertEqual(response.status_code, 200)
+                self.assertTrue(response.streaming)
+                timeline = json.loads(b''.join(response.streaming_content))
+                self.assertGreater(timeline['num_months'], 512)
+                self.assertEqual(timeline['num_months'], expected['num_months'])
+                for debt, expected_debt in zip(timeline['debt_per_month'], expected['debt_per_month']):
+                    self.assertAlmostEqual(debt, expected_debt, places=4)
+
+    def test_timeline_stream_simulates_once(self):
+        self.create_long_timeline()
+        url = reverse('get-timeline')
+        with mock.patch('api.simulation.simulate_phases', wraps=simulation.simulate_phases) as simulate_phases:
+            response = self.client.get(url, {'stream': 'true'})
+            b''.join(response.streaming_content)
+        simulate_phases.assert_called_once()
+
+    def test_timeline_stream_cannot_reduce_debt(self):
+        CreditCard.objects.create(
+            name='One',
+            interest_rate=20.0,
+            balance=1000_00,
+            min_payment=10_00,
+            min_payment_percent=10.0,
+            annual_fee=100_00,
+            user=self.user,
+        )
+        url = reverse('get-timeline')
+        self.assertEqual(self.client.get(url).json(), {'num_months': -1})
+        for params in (
+            {'stream': 'true'},
+            {'stream': 'true', 'method': 'events'},
+            {'stream': 'true', 'resolution': 'yearly'},
+            {'stream': 'true', 'max_points': 20},
+        ):
+            with self.subTest(params=params):
+                response = self.client.get(url, params)
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(response.json(), {'num_months': -1})
+
+    def create_long_timeline(self):
+        Income.objects.create(
+            name='Job',
+            user=self.user,
+            pay_amount=115_00,
+            pay_type=PayType.MONTHLY,
+        )
+        CreditCard.objects.create(
+            name='One',
+            interest_rate=5.0,
+            balance=20000_00,
+            min_payment=25_00,
+            min_payment_percent=0.03,
+            annual_fee=0,
+            user=self.user,
+        )
+
+    def test_timeline_resolution(self):
+        self.create_long_timeline()
+        url = reverse('get-timeline')
+        expected = self.client.get(url).json()
+        num_months = expected['num_months']
+
+        response = self.client.get(url, {'resolution': 'yearly'})
+        self.assertEqual(response.status_code, 200)
+        timeline = response.json()
+        self.assertEqual(timeline['num_months'], num_months)
+        months = [month for month, debt in timeline['points']]
+        self.assertEqual(months, list(range(12, num_months, 12)) + [num_months])
+        for month, debt in timeline['points']:
+            self.assertAlmostEqual(debt, expected['debt_per_month'][month - 1], places=4)
+
+    def test_timeline_max_points(self):
+        self.create_long_timeline()
+        url = reverse('get-timeline')
+        expected = self.client.get(url).json()
+        num_months = expected['num_months']
+
+        for params in ({'max_points': 50}, {'max_points': 20, 'resolution': 'quarterly', 'stream': 'true'}):
+            with self.subTest(params=params):
+                response = self.client.get(url, params)
+                self.assertEqual(response.status_code, 200)
+                if response.streaming:
+                    timeline = json.loads(b''.join(response.streaming_content))
+                else:
+                    timeline = response.json()
+                self.assertEqual(timeline['num_months'], num_months)
+                points = timeline['points']
+                self.assertEqual(len(points), params['max_points'])
+                self.assertEqual(points[-1], [num_months, 0])
+                months = [month for month, debt in points]
+                self.assertEqual(months, sorted(set(months)))
+                for month, debt in points:
+                    self.assertAlmostEqual(debt, expected['debt_per_month'][month - 1], places=4)
+
+    def test_timeline_invalid_downsampling(self):
+        url = reverse('get-timeline')
+        for params in ({'resolution': 'daily'}, {'max_points': 'a'}, {'max_points': 2}):
+            with self.subTest(params=params):
+                response = self.client.get(url, params)
+                self.assertEqual(response.status_code, 400)
+
+    def test_debts_strategies(self):
+        card = CreditCard.objects.create(
+            name='One',
+            interest_rate=20.0,
+            balance=1000_00,
+            min_payment=10_00,
+            min_payment_percent=10.0,
+            annual_fee=100_00,
+            user=self.user,
+        )
+        small_card = CreditCard.objects.create(
+            name='Two',
+            interest_rate=12.0,
+            balance=300_00,
+            min_payment=10_00,
+            min_payment_percent=10.0,
+            annual_fee=0,
+            user=self.user,
+        )
+        # 1.8% a month is more than 20% a year
+        overdraft = Overdraft.objects.create(
+            name='Over',
+            interest_rate=1.8,
+            balance=500_00,
+            monthly_fee=0,
+            user=self.user,
+        )
+        expected = {
+            'cost': [card, small_card, overdraft],
+            'avalanche': [overdraft, card, small_card],
+            'snowball': [small_card, overdraft, card],
+        }
+        for strategy, debts in expected.items():
+            with self.subTest(strategy=strategy):
+                response = self.client.get(self.url, {'strategy': strategy})
+                self.assertEqual(response.status_code, 200)
+                self.assertJSONEqual(response.content, [debt.to_JSON() for debt in debts])
+
+        response = self.client.get(self.url, {'weights': 'balance:-1'})
+        self.assertJSONEqual(response.content, [debt.to_JSON() for debt in expected['snowball']])
+        response = self.client.get(self.url, {'weights': 'cost:1,rate:0'})
+        self.assertJSONEqual(response.content, [debt.to_JSON() for debt in expected['cost']])
+
+    def test_debts_invalid_strategy(self):
+        for params in (
+            {'strategy': 'random'},
+            {'weights': 'age:1'},
+            {'weights': 'cost'},
+            {'weights': ''},
+            {'weights': 'cost:nan'},
+            {'weights': 'cost:1,balance:inf'},
+        ):
+            with self.subTest(params=params):
+                response = self.client.get(self.url, params)
+                self.assertEqual(response.status_code, 400)
+
+    def test_financial_summary(self):
+        for pay_type in PayType.values:
+            Income.objects.create(name='Job', user=self.user, pay_amount=1234_56, pay_type=pay_type)
+        Expense.objects.create(name='Rent', amount=500_00, user=self.user)
+        Expense.objects.create(name='Food', amount=300_00, user=self.user)
+        CreditCard.objects.create(
+            name='One',
+            interest_rate=20.0,
+            balance=1000_00,
+            min_payment=10_00,
+            min_payment_percent=10.0,
+            annual_fee=0,
+            user=self.user,
+        )
+        Overdraft.objects.create(
+            name='Over',
+            interest_rate=1.8,
+            balance=500_00,
+            monthly_fee=0,
+            user=self.user,
+        )
+        income = sum(income.get_monthly_amount() for income in self.user.incomes.all())
+
+        with self.assertNumQueries(1):
+            summary = self.user.get_financial_summary()
+        self.assertAlmostEqual(summary['monthly_income'], income)
+        self.assertEqual(summary['monthly_expenses'], 800_00)
+        self.assertEqual(summary['minimum_payments'], 10_00)
+        self.assertEqual(summary['total_debt'], 1500_00)
+        self.assertAlmostEqual(summary['money_after_expenses'], income - 800_00 - 10_00)
+        self.assertAlmostEqual(self.user.get_total_monthly_income(), income)
+        self.assertEqual(self.user.get_expenses(), 800_00)
+        self.assertEqual(self.user.get_minimum_payments(), 10_00)
+        self.assertEqual(self.user.get_total_debt(), serialize_money(1500_00))
+
+    def test_financial_summary_without_data(self):
+        self.assertEqual(self.user.get_financial_summary(), {
+            'monthly_income': 0,
+            'monthly_expenses': 0,
+            'minimum_payments': 0,
+            'total_debt': 0,
+            'money_after_expenses': 0,
+        })
@@ -0,0 +1,28 @@
+from django.test import SimpleTestCase
+
+from api.downsampling import every, every_length, lttb
+
+
+class DownsamplingTests(SimpleTestCase):
+
+    def test_lttb_keeps_first_and_last(self):
+        for length in range(3, 120):
+            points = [(month, (month * 7919) % 101) for month in range(1, length + 1)]
+            for threshold in range(3, length + 2):
+                with self.subTest(length=length, threshold=threshold):
+                    reduced = list(lttb(iter(points), length, threshold))
+                    self.assertEqual(len(reduced), min(threshold, length))
+                    self.assertEqual(reduced[0], points[0])
+                    self.assertEqual(reduced[-1], points[-1])
+                    months = [point[0] for point in reduced]
+                    self.assertEqual(months, sorted(set(months)))
+
+    def test_lttb_payoff_month(self):
+        points = [(month, 17 - month) for month in range(1, 18)]
+        self.assertEqual(list(lttb(points, 17, 13))[-1], (17, 0))
+
+    def test_every(self):
+        points = [(month, month) for month in range(1, 15)]
+        reduced = list(every(points, 12))
+        self.assertEqual(reduced, [(12, 12), (14, 14)])
+        self.assertEqual(len(reduced), every_length(14, 12))
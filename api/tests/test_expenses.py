@@ -88,6 +88,25 @@ class ExpensesTests(APIBaseTest):
         )
         response = self.client.get(self.list_url)
         self.assertEqual(
-            json.loads(response.content)[0]['type']['name'],
+            json.loads(response.content)['results'][0]['type']['name'],
             'First'
         )
+
+    def test_list_query_count(self):
+        # Data version and the expenses with their types, the token is cached
+        self.client.get(self.list_url)
+        for count in (10, 1000):
+            with self.subTest(count=count):
+                Expense.objects.all().delete()
+                Expense.objects.bulk_create(
+                    Expense(
+                        name='Expense {}'.format(i),
+                        amount=100_00,
+                        type=(self.type1, self.type2)[i % 2],
+                        user=self.user,
+                    )
+                    for i in range(count)
+                )
+                with self.assertNumQueries(2):
+                    response = self.client.get(self.list_url, {'page_size': count})
+                self.assertEqual(len(json.loads(response.content)['results']), count)
@@ -0,0 +1,86 @@
+import csv
+import io
+import json
+import os
+import tempfile
+
+from django.core.management import call_command
+from django.urls import reverse
+
+from api import exporting
+from api.models import CreditCard, Expense, TaxBracket, Type
+from api.tests.base import APIBaseTest
+
+
+class ExportTests(APIBaseTest):
+    url = reverse('export-data')
+
+    def setUp(self):
+        super().setUp()
+        self.type = Type.objects.create(name='Home', user=self.user)
+        Expense.objects.bulk_create(
+            Expense(name='Expense {}'.format(i), amount=i * 100, type=self.type, user=self.user)
+            for i in range(5)
+        )
+        self.credit_card = CreditCard.objects.create(
+            name='One',
+            interest_rate=20.0,
+            balance=1000_00,
+            min_payment=10_00,
+            min_payment_percent=10.0,
+            annual_fee=0,
+            user=self.user,
+        )
+        TaxBracket.objects.create(lower=0, upper=100, tax_rate=15.0, group='Federal', user=self.user)
+        # Not exported
+        other_user = self.user.__class__.objects.create_user(username='two', password='two')
+        Expense.objects.create(name='Other', amount=1_00, user=other_user)
+
+    def test_export_ndjson(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        records = [json.loads(line) for line in b''.join(response.streaming_content).decode().splitlines()]
+        self.assertEqual(
+            [record['model'] for record in records],
+            ['types'] + ['expenses'] * 5 + ['credit_cards', 'tax_brackets'],
+        )
+        self.assertEqual(records[0]['id'], str(self.type.id))
+        self.assertEqual(sorted(record['amount'] for record in records[1:6]), [0, 100, 200, 300, 400])
+        self.assertEqual(records[1]['type_id'], str(self.type.id))
+        self.assertEqual(records[6]['balance'], 1000_00)
+        self.assertEqual(records[6]['date_created'], self.credit_card.date_created.isoformat())
+        self.assertNotIn('user_id', records[6])
+
+    def test_export_csv(self):
+        response = self.client.get(self.url, {'file_format': 'csv', 'model': 'expenses'})
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('expenses.csv', response['Content-Disposition'])
+        rows = list(csv.reader(io.StringIO(b''.join(response.streaming_content).decode())))
+        self.assertEqual(rows[0], exporting.columns(Expense))
+        self.assertEqual(sorted(row[rows[0].index('name')] for row in rows[1:]), ['Expense {}'.format(i) for i in range(5)])
+
+    def test_export_chunks(self):
+        chunks = list(exporting.ndjson(self.user, chunk_size=2))
+        # Types, expenses in 3 chunks, credit cards and tax brackets
+        self.assertEqual([chunk.count('\n') for chunk in chunks], [1, 2, 2, 1, 1, 1])
+
+    def test_invalid_export(self):
+        response = self.client.get(self.url, {'file_format': 'xml'})
+        self.assertEqual(response.status_code, 400)
+        response = self.client.get(self.url, {'file_format': 'csv'})
+        self.assertEqual(response.status_code, 400)
+        response = self.client.get(self.url, {'file_format': 'csv', 'model': 'users'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_command(self):
+        out = io.StringIO()
+        call_command('export_data', self.user.username, stdout=out)
+        self.assertEqual(len(out.getvalue().splitlines()), 8)
+
+        with tempfile.TemporaryDirectory() as directory:
+            call_command('export_data', self.user.username, '--format=csv', '--output=' + directory, stderr=io.StringIO())
+            self.assertEqual(sorted(os.listdir(directory)), sorted(name + '.csv' for name in exporting.MODELS))
+            with open(os.path.join(directory, 'expenses.csv')) as export:
+                self.assertEqual(len(export.readlines()), 6)
@@ -0,0 +1,114 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from api.models import CreditCard, Expense, Income, Investment, Overdraft, PayType, TaxBracket, Type
+from api.serializers import (
+    CreditCardSerializer,
+    IncomeSerializer,
+    InvestmentSerializer,
+    OverdraftSerializer,
+    TaxBracketSerializer,
+)
+from api.tests.base import APIBaseTest
+
+
+class SparseFieldsTests(APIBaseTest):
+    url = reverse('creditcard-list')
+
+    def setUp(self):
+        super().setUp()
+        self.cards = [
+            CreditCard.objects.create(
+                name=name,
+                interest_rate=20.0,
+                balance=1000_00,
+                min_payment=10_00,
+                min_payment_percent=10.0,
+                annual_fee=annual_fee,
+                user=self.user,
+            )
+            for name, annual_fee in (('One', 0), ('Two', 99_00), ('Three', 120_00))
+        ]
+
+    def test_same_as_serializer(self):
+        Overdraft.objects.create(name='Over', interest_rate=1.0, balance=100_00, monthly_fee=0, user=self.user)
+        Investment.objects.create(name='Fund', interest_rate=5.0, min_duration=12, balance=500_00, user=self.user)
+        Income.objects.create(name='Job', pay_amount=500_00, pay_type=PayType.WEEKLY, pay_day=4, user=self.user)
+        TaxBracket.objects.create(lower=0, upper=50_000_00, tax_rate=15.0, group='single', user=self.user)
+        for url, model, serializer_class in (
+            (self.url, CreditCard, CreditCardSerializer),
+            (reverse('overdraft-list'), Overdraft, OverdraftSerializer),
+            (reverse('investment-list'), Investment, InvestmentSerializer),
+            (reverse('income-list'), Income, IncomeSerializer),
+        ):
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                expected = serializer_class(model.objects.order_by('date_created', 'id'), many=True).data
+                self.assertEqual(response.content, self.client.get(url, {'fields': ','.join(expected[0])}).content)
+                self.assertEqual(response.json()['results'], [dict(row) for row in expected])
+        response = self.client.get(reverse('taxbracket-list'))
+        self.assertEqual(response.json(), [dict(row) for row in TaxBracketSerializer(TaxBracket.objects.all(), many=True).data])
+
+    def test_fields(self):
+        response = self.client.get(self.url, {'fields': 'name,annual_fee,url'})
+        self.assertEqual(response.status_code, 200)
+        card = self.cards[1]
+        self.assertEqual(response.json()['results'][1], {
+            'name': 'Two',
+            'annual_fee': '99.00',
+            'url': card.get_absolute_url(),
+        })
+
+    def test_only_columns_read(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(self.url, {'fields': 'id,name'})
+        sql = queries.captured_queries[-1]['sql']
+        self.assertIn('"name"', sql)
+        self.assertNotIn('"balance"', sql)
+
+    def test_unknown_field(self):
+        response = self.client.get(self.url, {'fields': 'name,nonsense'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('fields', response.json())
+
+    def test_user_not_readable(self):
+        response = self.client.get(self.url, {'fields': 'user'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_retrieve(self):
+        card = self.cards[0]
+        response = self.client.get(card.get_absolute_url(), {'fields': 'id,balance'})
+        self.assertEqual(response.json(), {'id': str(card.id), 'balance': '1000.00'})
+
+    def test_writes_ignore_fields(self):
+        card = self.cards[0]
+        response = self.client.patch(card.get_absolute_url() + '?fields=name', {'balance': '5.00'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['balance'], '5.00')
+
+    def test_pages(self):
+        url = self.url + '?fields=name&page_size=2'
+        names = []
+        while url:
+            page = self.client.get(url).json()
+            names.extend(card['name'] for card in page['results'])
+            url = page['next']
+        self.assertEqual(names, ['One', 'Two', 'Three'])
+
+    def test_nested_fields(self):
+        food = Type.objects.create(name='Food', user=self.user)
+        Expense.objects.create(name='Lunch', amount=10_00, type=food, user=self.user)
+        url = reverse('expense-list')
+        response = self.client.get(url, {'fields': 'name,type'})
+        self.assertEqual(response.json()['results'][0], {
+            'name': 'Lunch',
+            'type': {'id': str(food.id), 'url': food.get_absolute_url(), 'name': 'Food'},
+        })
+        with self.assertNumQueries(2):
+            # The data version and the expenses, without the types
+            response = self.client.get(url, {'fields': 'name'})
+        self.assertEqual(response.json()['results'], [{'name': 'Lunch'}])
+
+        response = self.client.get(reverse('type-list'), {'fields': 'name,expenses'})
+        self.assertEqual(response.json()['results'][0]['expenses'][0]['name'], 'Lunch')
@@ -0,0 +1,155 @@
+import io
+import tempfile
+from unittest import mock
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.urls import reverse
+
+from api import importing
+from api.models import Expense, Income, PayType, Type, get_data_version
+from api.tests.base import APIBaseTest
+
+
+CSV = b"""Name,Amount,Type,Kind,Pay_Type
+Rent,-1200.00,Home,,
+Groceries,-85.50,Food,,
+Coffee,-4.25,Food,,
+Paycheque,2000.00,,,biweekly
+Refund,15.00,,expense,
+"""
+
+OFX = b"""OFXHEADER:100
+DATA:OFXSGML
+VERSION:102
+
+<OFX>
+<BANKMSGSRSV1><STMTTRNRS><STMTRS>
+<BANKTRANLIST>
+<STMTTRN>
+<TRNTYPE>DEBIT
+<DTPOSTED>20240105
+<TRNAMT>-42.10
+<FITID>1
+<NAME>Hardware store
+</STMTTRN>
+<STMTTRN><TRNTYPE>CREDIT<DTPOSTED>20240115<TRNAMT>1500<FITID>2<MEMO>Salary &amp; bonus</STMTTRN>
+</BANKTRANLIST>
+</STMTRS></STMTTRNRS></BANKMSGSRSV1>
+</OFX>
+"""
+
+
+class ImportTests(APIBaseTest):
+    url = reverse('import-transactions')
+
+    def upload(self, content, name='export.csv', **params):
+        url = self.url
+        if params:
+            url += '?' + '&'.join('{}={}'.format(key, value) for key, value in params.items())
+        return self.client.post(url, {'file': SimpleUploadedFile(name, content)}, format='multipart')
+
+    def test_import_csv(self):
+        Type.objects.create(name='Home', user=self.user)
+        version = get_data_version(self.user.pk)[0]
+        response = self.upload(CSV)
+        self.assertEqual(response.status_code, 201)
+        summary = response.json()
+        self.assertEqual(
+            (summary['rows'], summary['expenses'], summary['incomes'], summary['types'], summary['errors']),
+            (5, 4, 1, 1, 0),
+        )
+        self.assertEqual(
+            sorted(Expense.objects.filter(user=self.user).values_list('name', 'amount', 'type__name')),
+            [('Coffee', 4_25, 'Food'), ('Groceries', 85_50, 'Food'), ('Refund', 15_00, None), ('Rent', 1200_00, 'Home')],
+        )
+        income = Income.objects.get(user=self.user)
+        self.assertEqual((income.name, income.pay_amount, income.pay_type), ('Paycheque', 2000_00, PayType.BIWEEKLY))
+        self.assertEqual(Type.objects.filter(user=self.user).count(), 2)
+        self.assertEqual(get_data_version(self.user.pk)[0], version + 1)
+
+    def test_import_ofx(self):
+        response = self.upload(OFX, name='export.OFX')
+        self.assertEqual(response.status_code, 201)
+        expense = Expense.objects.get(user=self.user)
+        self.assertEqual((expense.name, expense.amount), ('Hardware store', 42_10))
+        income = Income.objects.get(user=self.user)
+        self.assertEqual((income.name, income.pay_amount, income.pay_type), ('Salary & bonus', 1500_00, PayType.MONTHLY))
+
+    def test_import_ofx_xml(self):
+        content = (
+            b'<?xml version="1.0"?><OFX><BANKTRANLIST>'
+            b'<STMTTRN><TRNAMT>-5.00</TRNAMT><NAME>Bus</NAME></STMTTRN>'
+            b'<STMTTRN><TRNAMT>-1.5</TRNAMT><NAME>Gum</NAME></STMTTRN>'
+            b'</BANKTRANLIST></OFX>'
+        )
+        rows = list(importing.ofx_rows(io.BytesIO(content)))
+        self.assertEqual(rows, [(1, {'name': 'Bus', 'amount': '-5.00'}), (2, {'name': 'Gum', 'amount': '-1.5'})])
+
+    def test_import_ofx_single_line(self):
+        transaction = b'<STMTTRN><TRNAMT>-1.00</TRNAMT><NAME>Caf\xc3\xa9 &amp; bar</NAME></STMTTRN>'
+        count = 2 * importing.OFX_READ_SIZE // len(transaction)
+        content = b'<?xml version="1.0"?><OFX><BANKTRANLIST>' + transaction * count + b'</BANKTRANLIST></OFX>'
+        file = io.BytesIO(content)
+        with mock.patch.object(file, 'read', wraps=file.read) as read:
+            rows = list(importing.ofx_rows(file))
+        self.assertEqual(len(rows), count)
+        self.assertEqual(rows[-1], (count, {'name': 'Caf\xe9 & bar', 'amount': '-1.00'}))
+        # Never the whole line at once
+        self.assertEqual({call.args for call in read.call_args_list}, {(importing.OFX_READ_SIZE,)})
+
+        # Pieces that split the tags and the characters
+        tags = list(importing.ofx_tags(io.BytesIO(content), read_size=7))
+        self.assertEqual(tags, list(importing.ofx_tags(io.BytesIO(content))))
+
+        response = self.upload(content, name='export.ofx')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()['expenses'], count)
+
+    def test_invalid_rows_are_reported(self):
+        content = b'name,amount\nRent,-1200.00\n,-5.00\nCoffee,-4\nBonus,100.00\n'
+        response = self.upload(content)
+        self.assertEqual(response.status_code, 201)
+        summary = response.json()
+        self.assertEqual((summary['expenses'], summary['incomes'], summary['errors']), (1, 1, 2))
+        self.assertEqual([error['row'] for error in summary['error_rows']], [3, 4])
+
+    def test_invalid_files(self):
+        response = self.client.post(self.url, {}, format='multipart')
+        self.assertEqual(response.status_code, 400)
+        response = self.upload(CSV, name='export.txt')
+        self.assertEqual(response.status_code, 400)
+        response = self.upload(CSV, name='export.txt', file_format='csv')
+        self.assertEqual(response.status_code, 201)
+        response = self.upload(b'date,total\n2024-01-01,5.00\n')
+        self.assertEqual(response.status_code, 400)
+        response = self.upload(b'name,amount\n\xff\xfe,1.00\n')
+        self.assertEqual(response.status_code, 400)
+
+    def test_chunks(self):
+        rows = b''.join(b'Expense %d,-1.00,Type %d\n' % (i, i % 3) for i in range(25))
+        progress = []
+        summary = importing.import_file(
+            self.user,
+            io.BytesIO(b'name,amount,type\n' + rows),
+            'csv',
+            chunk_size=10,
+            progress=lambda summary: progress.append(summary['expenses']),
+        )
+        self.assertEqual(progress, [10, 20, 25])
+        self.assertEqual((summary['expenses'], summary['types']), (25, 3))
+        self.assertEqual(Expense.objects.filter(user=self.user).count(), 25)
+
+    def test_command(self):
+        with tempfile.NamedTemporaryFile(suffix='.csv') as export:
+            export.write(CSV)
+            export.flush()
+            out = io.StringIO()
+            call_command('import_transactions', self.user.username, export.name, '--chunk-size=2', stdout=out)
+        self.assertIn('Imported 4 expenses and 1 incomes', out.getvalue())
+        self.assertIn('2 rows, 2 expenses', out.getvalue())
+        self.assertEqual(Expense.objects.filter(user=self.user).count(), 4)
+
+        with self.assertRaises(CommandError):
+            call_command('import_transactions', 'nobody', 'export.csv')
@@ -113,18 +113,18 @@ class IncomeTests(APIBaseTest):
         response = self.client.get(self.list_url)
         expected = IncomeSerializer(self.income1).data
         self.assertEqual(
-            json.loads(response.content)[0],
+            json.loads(response.content)['results'][0],
             expected
         )
         self.assertEqual(
-            json.loads(response.content)[0]['pay_day'],
+            json.loads(response.content)['results'][0]['pay_day'],
             'Friday',
         )
         self.assertEqual(
-            json.loads(response.content)[0]['pay_type'],
+            json.loads(response.content)['results'][0]['pay_type'],
             '13-pays-a-year',
         )
         self.assertEqual(
-            json.loads(response.content)[0]['pay_amount'],
+            json.loads(response.content)['results'][0]['pay_amount'],
             '100.00',
         )
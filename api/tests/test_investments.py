@@ -19,7 +19,7 @@ class InvestmentTests(APIBaseTest):
 
         response = self.client.get(self.url)
         self.assertEqual(response.status_code, 200)
-        self.assertJSONEqual(
-            response.content,
+        self.assertEqual(
+            response.json()['results'],
             [InvestmentSerializer(investment).data],
         )
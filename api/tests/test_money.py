@@ -0,0 +1,57 @@
+from django.test import SimpleTestCase
+from rest_framework import serializers
+
+from api.money import format_cents, format_cents_many, parse_cents, parse_cents_many
+from api.serializers import MoneyField
+
+
+class MoneyTests(SimpleTestCase):
+    cases = (
+        (0, '0.00'),
+        (5, '0.05'),
+        (99, '0.99'),
+        (100, '1.00'),
+        (1234, '12.34'),
+        (100000001, '1000000.01'),
+        (-5, '-0.05'),
+        (-1234, '-12.34'),
+    )
+
+    def test_format(self):
+        for cents, text in self.cases:
+            with self.subTest(cents=cents):
+                self.assertEqual(format_cents(cents), text)
+
+    def test_format_many(self):
+        self.assertEqual(
+            format_cents_many([cents for cents, text in self.cases] + [None]),
+            [text for cents, text in self.cases] + [None],
+        )
+
+    def test_parse(self):
+        for cents, text in self.cases:
+            with self.subTest(text=text):
+                self.assertEqual(parse_cents(text), cents)
+        for text, cents in (('1.5', 150), ('.5', 50), ('5.', 500), ('+1.00', 100), (' 2.25 ', 225), ('1.999', 199)):
+            with self.subTest(text=text):
+                self.assertEqual(parse_cents(text), cents)
+
+    def test_parse_invalid(self):
+        for text in ('', '.', '-.', '12', '1.2.3', 'a.00', '1.0a', '--1.00', '1 000.00', '١.٠٠'):
+            with self.subTest(text=text):
+                with self.assertRaises(ValueError):
+                    parse_cents(text)
+
+    def test_parse_many(self):
+        self.assertEqual(parse_cents_many(['12.34', '-0.05', '.5', '12']), [1234, -5, 50, None])
+
+    def test_money_field(self):
+        field = MoneyField()
+        self.assertEqual(field.to_representation(-50), '-0.50')
+        self.assertEqual(field.to_representation(0), 0)
+        self.assertEqual(field.to_representation_many([-50, 0, 1234]), ['-0.50', 0, '12.34'])
+        self.assertEqual(field.to_internal_value('-0.50'), -50)
+        for value in ('12', 'abc.de', 12.5):
+            with self.subTest(value=value):
+                with self.assertRaises(serializers.ValidationError):
+                    field.to_internal_value(value)
@@ -35,7 +35,7 @@ class OverdraftTests(APIBaseTest):
     def test_get_list(self):
         response = self.client.get(self.list_url)
         expected = OverdraftSerializer(self.overdraft).data
-        overdraft_from_response = json.loads(response.content)[0]
+        overdraft_from_response = json.loads(response.content)['results'][0]
         self.assertEqual(
             overdraft_from_response,
             expected
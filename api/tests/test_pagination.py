@@ -0,0 +1,57 @@
+from django.urls import reverse
+
+from api.models import Expense, TaxBracket
+from api.tests.base import APIBaseTest
+
+
+class PaginationTests(APIBaseTest):
+    list_url = reverse('expense-list')
+
+    def create_expenses(self, count):
+        Expense.objects.bulk_create(
+            Expense(name='Expense {}'.format(i), amount=100_00, user=self.user)
+            for i in range(count)
+        )
+
+    def test_pages(self):
+        self.create_expenses(20)
+        # Rows created at the same time are ordered by id
+        Expense.objects.filter(name__in=['Expense 3', 'Expense 4', 'Expense 5']).update(
+            date_created=Expense.objects.get(name='Expense 3').date_created,
+        )
+        expected = [str(pk) for pk in Expense.objects.order_by('date_created', 'id').values_list('pk', flat=True)]
+
+        ids = []
+        url = self.list_url + '?page_size=7'
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            page = response.json()
+            self.assertLessEqual(len(page['results']), 7)
+            ids.extend(expense['id'] for expense in page['results'])
+            url = page['next']
+        self.assertEqual(ids, expected)
+
+    def test_default_page_size(self):
+        self.create_expenses(101)
+        response = self.client.get(self.list_url)
+        self.assertEqual(len(response.json()['results']), 100)
+        response = self.client.get(response.json()['next'])
+        self.assertEqual(len(response.json()['results']), 1)
+        self.assertIsNone(response.json()['next'])
+
+    def test_max_page_size(self):
+        self.create_expenses(1001)
+        response = self.client.get(self.list_url, {'page_size': 5000})
+        self.assertEqual(len(response.json()['results']), 1000)
+
+    def test_invalid_cursor(self):
+        for cursor in ('nonsense', 'WyJhIiwgImIiXQ==', 'WzFd'):
+            with self.subTest(cursor=cursor):
+                response = self.client.get(self.list_url, {'cursor': cursor})
+                self.assertEqual(response.status_code, 404)
+
+    def test_tax_brackets_not_paginated(self):
+        TaxBracket.objects.create(lower=0, upper=50_000_00, tax_rate=15.0, group='single', user=self.user)
+        response = self.client.get(reverse('taxbracket-list'))
+        self.assertEqual(len(response.json()), 1)
@@ -0,0 +1,108 @@
+import unittest
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from api.models import (
+    CreditCard,
+    Expense,
+    Income,
+    Investment,
+    Overdraft,
+    PayType,
+    TaxBracket,
+    Type,
+)
+from .base import APIBaseTest
+
+
+# The debts are ordered by a priority calculated for the request's strategy,
+# which no index can provide, so these sort the user's debts in memory
+SORTED_BY_PRIORITY = ('get-debts', 'get-timeline')
+
+
+@unittest.skipUnless(connection.vendor == 'sqlite', 'Checks SQLite query plans')
+class QueryPlanTests(APIBaseTest):
+    """ EXPLAIN QUERY PLAN of every query run by each endpoint """
+
+    def setUp(self):
+        super().setUp()
+        expense_type = Type.objects.create(name='Home', user=self.user)
+        Expense.objects.create(name='Rent', amount=500_00, type=expense_type, user=self.user)
+        Expense.objects.create(name='Food', amount=300_00, type=expense_type, user=self.user)
+        Income.objects.create(name='Job', pay_amount=2000_00, pay_type=PayType.MONTHLY, user=self.user)
+        Investment.objects.create(name='Savings', interest_rate=2.0, min_duration=0, balance=100_00, user=self.user)
+        TaxBracket.objects.create(lower=0, upper=50_000_00, tax_rate=15.0, group='single', user=self.user)
+        CreditCard.objects.create(
+            name='One',
+            interest_rate=20.0,
+            balance=1000_00,
+            min_payment=10_00,
+            min_payment_percent=10.0,
+            annual_fee=100_00,
+            user=self.user,
+        )
+        Overdraft.objects.create(
+            name='Over',
+            interest_rate=1.8,
+            balance=500_00,
+            monthly_fee=5_00,
+            user=self.user,
+        )
+
+    def urls(self):
+        yield 'get-debts', reverse('get-debts')
+        yield 'get-timeline', reverse('get-timeline')
+        for name, model in (
+            ('creditcard', CreditCard),
+            ('expense', Expense),
+            ('income', Income),
+            ('investment', Investment),
+            ('overdraft', Overdraft),
+            ('taxbracket', TaxBracket),
+            ('type', Type),
+        ):
+            yield name + '-list', reverse(name + '-list')
+            pk = model.objects.values_list('pk', flat=True).first()
+            yield name + '-detail', reverse(name + '-detail', kwargs={'pk': pk})
+        # A page after the first one
+        response = self.client.get(reverse('expense-list'), {'page_size': 1})
+        yield 'expense-list-next', response.json()['next']
+
+    def explain(self, sql):
+        with connection.cursor() as cursor:
+            cursor.execute('EXPLAIN QUERY PLAN ' + sql)
+            return [row[-1] for row in cursor.fetchall()]
+
+    def test_no_full_scans_or_sorts(self):
+        for name, url in self.urls():
+            with self.subTest(url=name):
+                with CaptureQueriesContext(connection) as queries:
+                    response = self.client.get(url)
+                self.assertEqual(response.status_code, 200)
+                for query in queries:
+                    if not query['sql'].startswith('SELECT'):
+                        continue
+                    for step in self.explain(query['sql']):
+                        self.assertFalse(step.startswith('SCAN'), (step, query['sql']))
+                        if name not in SORTED_BY_PRIORITY:
+                            self.assertNotIn('TEMP B-TREE', step, query['sql'])
+
+    def test_next_page_starts_at_cursor(self):
+        response = self.client.get(reverse('expense-list'), {'page_size': 1})
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(response.json()['next'])
+        plan = [step for query in queries for step in self.explain(query['sql'])]
+        self.assertIn(
+            'SEARCH api_expense USING INDEX expense_user_created (user_id=? AND date_created>?)',
+            plan,
+        )
+
+    def test_debts_use_user_indexes(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(reverse('get-debts'))
+        plan = [step for query in queries for step in self.explain(query['sql'])]
+        # The debts are ordered by the priority, so only the user is searched for
+        self.assertIn('SEARCH api_creditcard USING INDEX api_creditcard_user_id_00df30e9 (user_id=?)', plan)
+        self.assertIn('SEARCH api_overdraft USING INDEX api_overdraft_user_id_44d4ddb7 (user_id=?)', plan)
@@ -0,0 +1,114 @@
+import base64
+import json
+import struct
+from datetime import date, datetime, time, timezone
+
+import msgpack
+from django.test import SimpleTestCase
+from django.urls import reverse
+from rest_framework import renderers
+
+from api.models import CreditCard, Income, PayType
+from api.renderers import JSONRenderer, MessagePackRenderer, ORJSONRenderer, float32_array
+from api.tests.base import APIBaseTest
+
+
+class RendererTests(APIBaseTest):
+    url = reverse('creditcard-list')
+    timeline_url = reverse('get-timeline')
+
+    def setUp(self):
+        super().setUp()
+        Income.objects.create(name='Job', pay_amount=200_00, pay_type=PayType.MONTHLY, user=self.user)
+        CreditCard.objects.create(
+            name='Café \u2028',
+            interest_rate=20.0,
+            balance=1000_00,
+            min_payment=10_00,
+            min_payment_percent=10.0,
+            annual_fee=100_00,
+            user=self.user,
+        )
+
+    def test_default_json(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response['Content-Type'], 'application/json')
+        self.assertEqual(response.content, renderers.JSONRenderer().render(response.data))
+
+    def test_fast_json(self):
+        for url in (self.url, self.timeline_url, reverse('get-debts')):
+            with self.subTest(url=url):
+                response = self.client.get(url, {'format': 'fastjson'})
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(response['Content-Type'], 'application/json')
+                self.assertEqual(response.content, self.client.get(url).content)
+
+    def test_msgpack(self):
+        for accept in ({'HTTP_ACCEPT': 'application/msgpack'}, {'data': {'format': 'msgpack'}}):
+            with self.subTest(accept=accept):
+                response = self.client.get(self.url, **accept)
+                self.assertEqual(response['Content-Type'], 'application/msgpack')
+                self.assertEqual(msgpack.unpackb(response.content), self.client.get(self.url).json())
+
+    def test_etag_per_format(self):
+        etag = self.client.get(self.url)['ETag']
+        for accept in ({'HTTP_ACCEPT': 'application/msgpack'}, {'data': {'format': 'fastjson'}}):
+            with self.subTest(accept=accept):
+                response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag, **accept)
+                self.assertEqual(response.status_code, 200)
+                self.assertNotEqual(response['ETag'], etag)
+                self.assertIn('Accept', response['Vary'])
+                response = self.client.get(self.url, HTTP_IF_NONE_MATCH=response['ETag'], **accept)
+                self.assertEqual(response.status_code, 304)
+
+    def test_float32_timeline(self):
+        timeline = self.client.get(self.timeline_url).json()
+        response = self.client.get(self.timeline_url, {'array': 'float32'}, HTTP_ACCEPT='application/msgpack')
+        packed = msgpack.unpackb(response.content)
+        self.assertEqual(packed['num_months'], timeline['num_months'])
+        debt_per_month = struct.unpack('<{}f'.format(timeline['num_months']), packed['debt_per_month'])
+        for debt, expected in zip(debt_per_month, timeline['debt_per_month']):
+            self.assertAlmostEqual(debt, expected, delta=abs(expected) * 1e-6)
+
+        response = self.client.get(self.timeline_url, {'array': 'float32'})
+        self.assertEqual(base64.b64decode(response.json()['debt_per_month']), packed['debt_per_month'])
+
+    def test_streamed_timeline_json(self):
+        etag = self.client.get(self.timeline_url, {'stream': 'true'})['ETag']
+        self.assertTrue(etag.endswith('-json"'), etag)
+        for params, accept in (({'stream': 'true'}, 'application/msgpack'), ({'stream': 'true', 'format': 'msgpack'}, '*/*')):
+            with self.subTest(params=params, accept=accept):
+                response = self.client.get(self.timeline_url, params, HTTP_ACCEPT=accept)
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(response['Content-Type'], 'application/json')
+                self.assertEqual(response['ETag'], etag)
+                self.assertEqual(json.loads(b''.join(response.streaming_content))['num_months'], 7)
+
+    def test_invalid_array(self):
+        response = self.client.get(self.timeline_url, {'array': 'float64'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('array', response.json())
+
+
+class RenderTests(SimpleTestCase):
+    data = {'a': [1, 2.5, None, True], 'b': {'c': 'd\u2029'}, 'e': b'\x00\x01'}
+
+    def test_same_json(self):
+        self.assertEqual(ORJSONRenderer().render(self.data), JSONRenderer().render(self.data))
+
+    def test_same_json_dates_and_large_integers(self):
+        data = {
+            'datetime': datetime(2020, 1, 2, 3, 4, 5, 678901, tzinfo=timezone.utc),
+            'date': date(2020, 1, 2),
+            'time': time(3, 4, 5, 678901),
+            'integer': 2 ** 70,
+        }
+        for value in data.values():
+            with self.subTest(value=value):
+                self.assertEqual(ORJSONRenderer().render([value]), JSONRenderer().render([value]))
+
+    def test_msgpack_bytes(self):
+        self.assertEqual(msgpack.unpackb(MessagePackRenderer().render(self.data))['e'], b'\x00\x01')
+
+    def test_float32_array(self):
+        self.assertEqual(float32_array([1.0, 0.5]), struct.pack('<2f', 1.0, 0.5))
@@ -0,0 +1,133 @@
+import io
+
+from django.core.management import CommandError, call_command
+
+from api.models import (
+    SUMMARY_FIELDS,
+    CreditCard,
+    Expense,
+    FinancialSummary,
+    Income,
+    Overdraft,
+    PayType,
+    get_summary,
+)
+from api.tests.base import APIBaseTest
+
+
+class FinancialSummaryTests(APIBaseTest):
+
+    def setUp(self):
+        super().setUp()
+        get_summary(self.user.pk)
+
+    def assertSummaryCorrect(self):
+        summary = FinancialSummary.objects.get(user=self.user)
+        totals = self.user.get_financial_summary()
+        for field in SUMMARY_FIELDS:
+            self.assertAlmostEqual(getattr(summary, field), totals[field], msg=field)
+
+    def create_card(self, **kwargs):
+        values = {
+            'name': 'One',
+            'interest_rate': 20.0,
+            'balance': 1000_00,
+            'min_payment': 10_00,
+            'min_payment_percent': 10.0,
+            'annual_fee': 0,
+            'user': self.user,
+        }
+        values.update(kwargs)
+        return CreditCard.objects.create(**values)
+
+    def test_created(self):
+        Income.objects.create(name='Job', pay_amount=500_00, pay_type=PayType.WEEKLY, user=self.user)
+        Expense.objects.create(name='Rent', amount=300_00, user=self.user)
+        self.create_card()
+        Overdraft.objects.create(name='Over', interest_rate=20.0, balance=200_00, monthly_fee=5_00, user=self.user)
+        summary = FinancialSummary.objects.get(user=self.user)
+        self.assertEqual(summary.total_debt, 1200_00)
+        self.assertEqual(summary.monthly_expenses, 300_00)
+        self.assertEqual(summary.minimum_payments, 10_00)
+        self.assertSummaryCorrect()
+
+    def test_updated(self):
+        income = Income.objects.create(name='Job', pay_amount=500_00, pay_type=PayType.WEEKLY, user=self.user)
+        card = self.create_card()
+        income.pay_type = PayType.MONTHLY
+        income.save()
+        card.balance = 500_00
+        card.min_payment = 5_00
+        card.save()
+        # Loaded from the database rather than the created instance
+        card = CreditCard.objects.get(pk=card.pk)
+        card.balance = 400_00
+        card.save()
+        self.assertEqual(FinancialSummary.objects.get(user=self.user).total_debt, 400_00)
+        self.assertSummaryCorrect()
+
+    def test_updated_with_deferred_fields(self):
+        card = self.create_card()
+        card = CreditCard.objects.only('id', 'user').get(pk=card.pk)
+        card.balance = 300_00
+        card.save()
+        self.assertEqual(FinancialSummary.objects.get(user=self.user).total_debt, 300_00)
+        self.assertSummaryCorrect()
+
+    def test_created_without_all_fields(self):
+        for pay_type in PayType.values:
+            with self.subTest(pay_type=pay_type):
+                income = Income(name='Job', pay_type=pay_type, user=self.user)
+                income.pay_amount = 500_00
+                income.save()
+        Expense(name='Rent', user=self.user)
+        self.assertSummaryCorrect()
+
+    def test_deleted(self):
+        Expense.objects.create(name='Rent', amount=300_00, user=self.user)
+        Expense.objects.create(name='Food', amount=100_00, user=self.user).delete()
+        self.create_card().delete()
+        Expense.objects.filter(name='Rent').delete()
+        self.assertEqual(FinancialSummary.objects.get(user=self.user).monthly_expenses, 0)
+        self.assertSummaryCorrect()
+
+    def test_write_query_count(self):
+        card = self.create_card()
+        card.balance = 500_00
+        with self.assertNumQueries(3):
+            # The card, the data version and the summary
+            card.save()
+        with self.assertNumQueries(2):
+            # Nothing in the summary changed so only the card and the data version
+            card.name = 'Renamed'
+            card.save()
+
+    def test_read_from_summary(self):
+        self.create_card(balance=1234_00)
+        with self.assertNumQueries(1):
+            self.assertEqual(self.user.get_total_debt(), '1234.00')
+
+    def test_built_when_missing(self):
+        self.create_card()
+        FinancialSummary.objects.all().delete()
+        self.assertEqual(self.user.get_total_debt(), '1000.00')
+        self.assertSummaryCorrect()
+
+    def test_command(self):
+        self.create_card()
+        out = io.StringIO()
+        call_command('rebuild_summaries', '--check', stdout=out)
+        self.assertIn('up to date', out.getvalue())
+
+        # Changes that don't send signals aren't in the summary
+        CreditCard.objects.update(balance=2000_00)
+        with self.assertRaises(CommandError):
+            call_command('rebuild_summaries', '--check', stdout=io.StringIO())
+
+        call_command('rebuild_summaries', '--user=' + self.user.username, stdout=io.StringIO())
+        self.assertSummaryCorrect()
+        call_command('rebuild_summaries', '--check', stdout=io.StringIO())
+
+    def test_command_unknown_user(self):
+        with self.assertRaises(CommandError):
+            call_command('rebuild_summaries', '--user=nobody', stdout=io.StringIO())
@@ -0,0 +1,42 @@
+import json
+
+from django.urls import reverse
+
+from api.models import Expense, Type
+from api.tests.base import APIBaseTest
+
+
+class TypesTests(APIBaseTest):
+    list_url = reverse('type-list')
+
+    def test_get_type_has_expenses(self):
+        expense_type = Type.objects.create(name='Home', user=self.user)
+        expense = Expense.objects.create(name='Rent', amount=500_00, type=expense_type, user=self.user)
+        url = reverse('type-detail', kwargs={'pk': expense_type.id})
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        expenses = json.loads(response.content)['expenses']
+        self.assertEqual(len(expenses), 1)
+        self.assertEqual(expenses[0]['id'], str(expense.id))
+        self.assertEqual(expenses[0]['amount'], '500.00')
+        self.assertEqual(expenses[0]['user']['username'], self.user.username)
+
+    def test_list_query_count(self):
+        # Data version, the types and their expenses with their users, the token is cached
+        self.client.get(self.list_url)
+        for count in (10, 1000):
+            with self.subTest(count=count):
+                Type.objects.all().delete()
+                types = Type.objects.bulk_create(
+                    Type(name='Type {}'.format(i), user=self.user) for i in range(count)
+                )
+                Expense.objects.bulk_create(
+                    Expense(name='Expense', amount=100_00, type=expense_type, user=self.user)
+                    for expense_type in types
+                    for _ in range(2)
+                )
+                with self.assertNumQueries(3):
+                    response = self.client.get(self.list_url, {'page_size': count})
+                types = json.loads(response.content)['results']
+                self.assertEqual(len(types), count)
+                self.assertTrue(all(len(expense_type['expenses']) == 2 for expense_type in types))
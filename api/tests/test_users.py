@@ -4,6 +4,7 @@ from rest_framework import status
 from rest_framework.authtoken.models import Token
 from rest_framework.test import APIClient, APITestCase
 
+from api.models import CreditCard, DataVersion, FinancialSummary, get_summary
 from api.serializers import UserSerializer
 
 
@@ -89,9 +90,9 @@ class UserTests(APITestCase):
         Ensure admins can view all users
         """
         response = self.client.get(reverse('user-list'))
-        self.assertEqual(len(response.data), 3)
-        self.assertJSONEqual(
-            response.content,
+        self.assertEqual(len(response.data['results']), 3)
+        self.assertEqual(
+            response.json()['results'],
             [
                 UserSerializer(self.admin).data,
                 UserSerializer(self.user_one).data,
@@ -134,7 +135,7 @@ class UserTests(APITestCase):
         """
         client = APIClient()
         response = client.get(reverse('user-list'))
-        self.assertEqual(len(response.data), 0)
+        self.assertEqual(len(response.data['results']), 0)
 
     def test_user_cannot_view_user_list(self):
         """
@@ -146,9 +147,9 @@ class UserTests(APITestCase):
         url = reverse('user-list')
         response = client.get(url)
         self.assertEqual(response.status_code, 200)
-        self.assertEqual(len(response.data), 1)
-        self.assertJSONEqual(
-            response.content,
+        self.assertEqual(len(response.data['results']), 1)
+        self.assertEqual(
+            response.json()['results'],
             [UserSerializer(self.user_one).data],
         )
 
@@ -171,3 +172,21 @@ class UserTests(APITestCase):
         url = reverse('user-detail', kwargs={'pk': self.user_two.pk})
         response = client.get(url)
         self.assertEqual(response.status_code, 404)
+
+    def test_admin_can_delete_user_with_data(self):
+        CreditCard.objects.create(
+            name='One',
+            interest_rate=20.0,
+            balance=1000_00,
+            min_payment=10_00,
+            min_payment_percent=10.0,
+            annual_fee=0,
+            user=self.user_two,
+        )
+        get_summary(self.user_two.pk)
+        url = reverse('user-detail', kwargs={'pk': self.user_two.pk})
+        response = self.client.delete(url)
+        self.assertEqual(response.status_code, 204)
+        self.assertFalse(User.objects.filter(pk=self.user_two.pk).exists())
+        self.assertFalse(DataVersion.objects.filter(user_id=self.user_two.pk).exists())
+        self.assertFalse(FinancialSummary.objects.filter(user_id=self.user_two.pk).exists())
@@ -17,6 +17,12 @@ creditcard_detail = views.CreditCardViewSet.as_view({
     'delete': 'destroy'
 })
 
+creditcard_bulk = views.CreditCardViewSet.as_view({
+    'post': 'bulk_create',
+    'patch': 'bulk_partial_update',
+    'delete': 'bulk_destroy'
+})
+
 expense_list = views.ExpenseViewSet.as_view({
     'get': 'list',
     'post': 'create'
@@ -29,6 +35,12 @@ expense_detail = views.ExpenseViewSet.as_view({
     'delete': 'destroy'
 })
 
+expense_bulk = views.ExpenseViewSet.as_view({
+    'post': 'bulk_create',
+    'patch': 'bulk_partial_update',
+    'delete': 'bulk_destroy'
+})
+
 income_list = views.IncomeViewSet.as_view({
     'get': 'list',
     'post': 'create'
@@ -41,6 +53,12 @@ income_detail = views.IncomeViewSet.as_view({
     'delete': 'destroy'
 })
 
+income_bulk = views.IncomeViewSet.as_view({
+    'post': 'bulk_create',
+    'patch': 'bulk_partial_update',
+    'delete': 'bulk_destroy'
+})
+
 overdraft_list = views.OverdraftViewSet.as_view({
     'get': 'list',
     'post': 'create'
@@ -53,6 +71,12 @@ overdraft_detail = views.OverdraftViewSet.as_view({
     'delete': 'destroy'
 })
 
+overdraft_bulk = views.OverdraftViewSet.as_view({
+    'post': 'bulk_create',
+    'patch': 'bulk_partial_update',
+    'delete': 'bulk_destroy'
+})
+
 type_list = views.TypeViewSet.as_view({
     'get': 'list',
     'post': 'create'
@@ -65,6 +89,12 @@ type_detail = views.TypeViewSet.as_view({
     'delete': 'destroy'
 })
 
+type_bulk = views.TypeViewSet.as_view({
+    'post': 'bulk_create',
+    'patch': 'bulk_partial_update',
+    'delete': 'bulk_destroy'
+})
+
 investment_list = views.InvestmentViewSet.as_view({
     'get': 'list',
     'post': 'create'
@@ -77,6 +107,12 @@ investment_detail = views.InvestmentViewSet.as_view({
     'delete': 'destroy'
 })
 
+investment_bulk = views.InvestmentViewSet.as_view({
+    'post': 'bulk_create',
+    'patch': 'bulk_partial_update',
+    'delete': 'bulk_destroy'
+})
+
 taxbracket_list = views.TaxBracketViewSet.as_view({
     'get': 'list',
     'post': 'create'
@@ -89,6 +125,12 @@ taxbracket_detail = views.TaxBracketViewSet.as_view({
     'delete': 'destroy'
 })
 
+taxbracket_bulk = views.TaxBracketViewSet.as_view({
+    'post': 'bulk_create',
+    'patch': 'bulk_partial_update',
+    'delete': 'bulk_destroy'
+})
+
 user_list = views.UserViewSet.as_view({
     'get': 'list',
     'post': 'create_user'
@@ -107,42 +149,63 @@ urlpatterns = [
     path('credit-cards/',
         creditcard_list,
         name='creditcard-list'),
+    path('credit-cards/bulk/',
+         creditcard_bulk,
+         name='creditcard-bulk'),
     path('credit-cards/<uuid:pk>/',
          creditcard_detail,
          name='creditcard-detail'),
     path('expenses/',
         expense_list,
         name='expense-list'),
+    path('expenses/bulk/',
+         expense_bulk,
+         name='expense-bulk'),
     path('expenses/<uuid:pk>/',
          expense_detail,
          name='expense-detail'),
     path('incomes/',
         income_list,
         name='income-list'),
+    path('incomes/bulk/',
+         income_bulk,
+         name='income-bulk'),
     path('incomes/<uuid:pk>/',
          income_detail,
          name='income-detail'),
     path('overdrafts/',
         overdraft_list,
         name='overdraft-list'),
+    path('overdrafts/bulk/',
+         overdraft_bulk,
+         name='overdraft-bulk'),
     path('overdrafts/<uuid:pk>/',
         overdraft_detail,
         name='overdraft-detail'),
     path('types/',
         type_list,
         name='type-list'),
+    path('types/bulk/',
+         type_bulk,
+         name='type-bulk'),
     path('types/<uuid:pk>/',
         type_detail,
         name='type-detail'),
     path('investments/',
         investment_list,
         name='investment-list'),
+    path('investments/bulk/',
+         investment_bulk,
+         name='investment-bulk'),
     path('investments/<uuid:pk>/',
         investment_detail,
         name='investment-detail'),
     path('taxbrackets/',
         taxbracket_list,
         name='taxbracket-list'),
+    path('taxbrackets/bulk/',
+         taxbracket_bulk,
+         name='taxbracket-bulk'),
     path('taxbrackets/<uuid:pk>/',
         taxbracket_detail,
         name='taxbracket-detail'),
@@ -157,7 +220,13 @@ urlpatterns = [
         name='get-debts'),
     path('timeline/',
         views.get_debt_timeline,
-        name='get-timeline')
+        name='get-timeline'),
+    path('import/',
+        views.import_transactions,
+        name='import-transactions'),
+    path('export/',
+        views.export_data,
+        name='export-data'),
 ]
 
 urlpatterns += [
@@ -1,16 +1,18 @@
-def sort_debts(debts):
-    moved = True
-    while moved:
-        moved = False
-        for index in range(1, len(debts)):
-            if debts[index-1].cost() < debts[index].cost():
-                moved = True
-                temp = debts[index-1]
-                debts[index-1] = debts[index]
-                debts[index] = temp
-    return debts
+import uuid
+
+from django.urls import reverse
+
+from api.money import format_cents
+
+
+def detail_url_parts(view_name):
+    """
+    The view's URL either side of the pk as (prefix, suffix), so the URLs
+    of many rows are built without a reverse() for each of them
+    """
+    placeholder = str(uuid.UUID(int=0))
+    return tuple(reverse(view_name, kwargs={'pk': placeholder}).split(placeholder))
 
 
 def serialize_money(money_int):
-    money_str = str(money_int)
-    return money_str[:-2] + '.' + money_str[-2:]
+    return format_cents(money_int)
@@ -1,9 +1,21 @@
+import json
+import math
+
 from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Prefetch
+from django.http import StreamingHttpResponse
 from rest_framework import filters, permissions, status, viewsets
-from rest_framework.decorators import action, api_view
+from rest_framework.decorators import action, api_view, permission_classes
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
 from rest_framework.reverse import reverse
 
+from . import caching, downsampling, exporting, importing, renderers, simulation
+from .bulk import BulkMixin
+from .concurrency import run_simulation
+from .conditional import ConditionalGetMixin, conditional_response
+from .fieldsets import SparseFieldsMixin
 from .models import (
     CreditCard,
     Expense,
@@ -14,9 +26,12 @@ from .models import (
     Type,
     User,
 )
+from .pagination import UserPagination
+from .queries import FACTORS, STRATEGIES, ordered_debts
 from .serializers import (
     CreateUserSerializer,
     CreditCardSerializer,
+    DebtListSerializer,
     DisplayExpenseSerializer,
     ExpenseSerializer,
     IncomeSerializer,
@@ -26,7 +41,6 @@ from .serializers import (
     TypeSerializer,
     UserSerializer,
 )
-from .utils import sort_debts
 
 
 @api_view(('GET',))
@@ -51,7 +65,32 @@ class IsOwnerFilterBackend(filters.BaseFilterBackend):
         return queryset.filter(user=request.user)
 
 
-class CreditCardViewSet(viewsets.ModelViewSet):
+class AtomicWriteMixin:
+    """
+    Run writes in a transaction so the user's data version,
+    bumped when the data is saved or deleted, changes along with it.
+    """
+
+    def perform_create(self, serializer):
+        with transaction.atomic():
+            super().perform_create(serializer)
+
+    def perform_update(self, serializer):
+        with transaction.atomic():
+            super().perform_update(serializer)
+
+    def perform_destroy(self, instance):
+        with transaction.atomic():
+            super().perform_destroy(instance)
+
+
+class CreditCardViewSet(
+    ConditionalGetMixin,
+    SparseFieldsMixin,
+    AtomicWriteMixin,
+    BulkMixin,
+    viewsets.ModelViewSet,
+):
     queryset = CreditCard.objects.all()
     serializer_class = CreditCardSerializer
     filter_backends = (IsOwnerFilterBackend,)
@@ -59,8 +98,15 @@ class CreditCardViewSet(viewsets.ModelViewSet):
     lookup_field = 'pk'
 
 
-class ExpenseViewSet(viewsets.ModelViewSet):
-    queryset = Expense.objects.all()
+class ExpenseViewSet(
+    ConditionalGetMixin,
+    SparseFieldsMixin,
+    AtomicWriteMixin,
+    BulkMixin,
+    viewsets.ModelViewSet,
+):
+    # DisplayExpenseSerializer includes the type
+    queryset = Expense.objects.select_related('type')
     serializer_class = ExpenseSerializer
     filter_backends = (IsOwnerFilterBackend,)
     permission_classes = (permissions.IsAuthenticated,)
@@ -73,7 +119,13 @@ class ExpenseViewSet(viewsets.ModelViewSet):
         return ExpenseSerializer
 
 
-class IncomeViewSet(viewsets.ModelViewSet):
+class IncomeViewSet(
+    ConditionalGetMixin,
+    SparseFieldsMixin,
+    AtomicWriteMixin,
+    BulkMixin,
+    viewsets.ModelViewSet,
+):
     queryset = Income.objects.all()
     serializer_class = IncomeSerializer
     filter_backends = (IsOwnerFilterBackend,)
@@ -81,7 +133,13 @@ class IncomeViewSet(viewsets.ModelViewSet):
     lookup_field = 'pk'
 
 
-class OverdraftViewSet(viewsets.ModelViewSet):
+class OverdraftViewSet(
+    ConditionalGetMixin,
+    SparseFieldsMixin,
+    AtomicWriteMixin,
+    BulkMixin,
+    viewsets.ModelViewSet,
+):
     queryset = Overdraft.objects.all()
     serializer_class = OverdraftSerializer
     filter_backends = (IsOwnerFilterBackend,)
@@ -89,15 +147,30 @@ class OverdraftViewSet(viewsets.ModelViewSet):
     lookup_field = 'pk'
 
 
-class TypeViewSet(viewsets.ModelViewSet):
-    queryset = Type.objects.all()
+class TypeViewSet(
+    ConditionalGetMixin,
+    SparseFieldsMixin,
+    AtomicWriteMixin,
+    BulkMixin,
+    viewsets.ModelViewSet,
+):
+    # TypeSerializer includes the expenses and each of their users
+    queryset = Type.objects.prefetch_related(
+        Prefetch('expenses', queryset=Expense.objects.select_related('user')),
+    )
     serializer_class = TypeSerializer
     filter_backends = (IsOwnerFilterBackend,)
     permission_classes = (permissions.IsAuthenticated,)
     lookup_field = 'pk'
 
 
-class InvestmentViewSet(viewsets.ModelViewSet):
+class InvestmentViewSet(
+    ConditionalGetMixin,
+    SparseFieldsMixin,
+    AtomicWriteMixin,
+    BulkMixin,
+    viewsets.ModelViewSet,
+):
     queryset = Investment.objects.all()
     serializer_class = InvestmentSerializer
     filter_backends = (IsOwnerFilterBackend,)
@@ -105,12 +178,20 @@ class InvestmentViewSet(viewsets.ModelViewSet):
     lookup_field = 'pk'
 
 
-class TaxBracketViewSet(viewsets.ModelViewSet):
+class TaxBracketViewSet(
+    ConditionalGetMixin,
+    SparseFieldsMixin,
+    AtomicWriteMixin,
+    BulkMixin,
+    viewsets.ModelViewSet,
+):
     queryset = TaxBracket.objects.all()
     serializer_class = TaxBracketSerializer
     filter_backends = (IsOwnerFilterBackend,)
     permission_classes = (permissions.IsAuthenticated,)
     lookup_field = 'pk'
+    # Only a few per user and they are used together
+    pagination_class = None
 
 
 class IsAdminOrOwner(permissions.BasePermission):
@@ -126,9 +207,10 @@ class IsAdminOrOwner(permissions.BasePermission):
         return obj == request.user
 
 
-class UserViewSet(viewsets.ModelViewSet):
+class UserViewSet(SparseFieldsMixin, viewsets.ModelViewSet):
     serializer_class = UserSerializer
     permission_classes = (IsAdminOrOwner,)
+    pagination_class = UserPagination
 
     @action(methods=['POST'], detail=False)
     def create_user(self, request):
@@ -151,6 +233,38 @@ class UserViewSet(viewsets.ModelViewSet):
         return User.objects.filter(pk=self.request.user.pk)
 
 
+def get_strategy(request):
+    """
+    Strategy for ordered_debts() from ?strategy=snowball or
+    ?weights=cost:1,balance:-0.01 along with a name for it.
+    """
+    weights = request.query_params.get('weights')
+    if weights is not None:
+        try:
+            weights = {
+                name: float(weight)
+                for name, weight in (item.split(':') for item in weights.split(','))
+            }
+        except ValueError:
+            weights = None
+        if (
+            not weights
+            or not set(weights) <= set(FACTORS)
+            or not all(math.isfinite(weight) for weight in weights.values())
+        ):
+            raise ValidationError({'weights': [
+                'Must be a comma separated list of name:weight, '
+                'the names being one of {} and the weights numbers.'.format(', '.join(FACTORS)),
+            ]})
+        name = ','.join('{}:{}'.format(name, weight) for name, weight in sorted(weights.items()))
+        return weights, name
+
+    strategy = request.query_params.get('strategy', 'cost')
+    if strategy not in STRATEGIES:
+        raise ValidationError({'strategy': ['Must be one of {}.'.format(', '.join(STRATEGIES))]})
+    return strategy, strategy
+
+
 @api_view(['GET'])
 def get_debts(request):
     """
@@ -158,49 +272,220 @@ def get_debts(request):
     when the debt is paid, the card should be cancelled so you can pay off
     other debt sooner.
     """
-    overdrafts = Overdraft.objects.filter(user=request.user).order_by('monthly_fee').all()
-    credit_cards = CreditCard.objects.order_by('-interest_rate', '-annual_fee').all()
-    result = sort_debts(list(overdrafts) + list(credit_cards))
+    strategy, strategy_name = get_strategy(request)
 
-    serialized = []
-    for debt in result:
-        serialized.append(debt.to_JSON())
-    return Response(serialized)
+    def serialize_debts():
+        return DebtListSerializer(ordered_debts(request.user, strategy)).data
+
+    return conditional_response(
+        request,
+        lambda: Response(caching.get_or_compute(request, 'debts:' + strategy_name, serialize_debts)),
+    )
 
 
 @api_view(['GET'])
 def get_debt_timeline(request):
-    overdrafts = Overdraft.objects.filter(user=request.user).order_by('monthly_fee').all()
-    credit_cards = CreditCard.objects.order_by('interest_rate', 'annual_fee').all()
-    debts = sort_debts(list(overdrafts) + list(credit_cards))
+    method = request.query_params.get('method', simulation.STEP)
+    if method not in simulation.METHODS:
+        return Response(
+            {'method': ['Must be one of {}.'.format(', '.join(simulation.METHODS))]},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    # debt_per_month as packed numbers for charts, ?array=float32
+    array_format = request.query_params.get('array')
+    if array_format is not None and array_format not in renderers.ARRAY_FORMATS:
+        return Response(
+            {'array': ['Must be one of {}.'.format(', '.join(renderers.ARRAY_FORMATS))]},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    # Only the debt at these months, for example ?months=12,24,60
+    months = request.query_params.get('months', request.query_params.get('month'))
+    if months is not None:
+        try:
+            months = [int(month) for month in months.split(',')]
+        except ValueError:
+            months = None
+        if not months or min(months) < 0:
+            return Response(
+                {'months': ['Must be a comma separated list of months.']},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
 
-    num_months = 0
-    user = User.objects.get(username=request.user.username)
-    # Amount to put towards debts
-    payment = user.get_money_after_expenses()
-    # Amount of debt each month
-    debt_per_month = []
-
-    for index, debt in enumerate(debts):
-        result = debt.timeline(payment)
-        if result['num_months'] == -1:
+    resolution = request.query_params.get('resolution', 'monthly')
+    if resolution not in downsampling.RESOLUTIONS:
+        return Response(
+            {'resolution': ['Must be one of {}.'.format(', '.join(downsampling.RESOLUTIONS))]},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    resolution = downsampling.RESOLUTIONS[resolution]
+
+    max_points = request.query_params.get('max_points')
+    if max_points is not None:
+        try:
+            max_points = int(max_points)
+        except ValueError:
+            max_points = 0
+        if max_points < 3:
+            return Response(
+                {'max_points': ['Must be a number of at least 3.']},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+    strategy, strategy_name = get_strategy(request)
+
+    stream = months is None and request.query_params.get('stream') in ('1', 'true')
+    if stream:
+        # The streamed timeline is written as JSON whichever format was asked for,
+        # so its ETag and the {"num_months": -1} answer are JSON as well
+        request.accepted_renderer = renderers.JSONRenderer()
+        request.accepted_media_type = renderers.JSONRenderer.media_type
+
+    # After the parameters are checked so errors aren't answered with 304
+    return conditional_response(request, lambda: timeline_response(
+        request, method, array_format, months, resolution, max_points, strategy, strategy_name, stream,
+    ))
+
+
+def timeline_response(
+    request,
+    method,
+    array_format,
+    months,
+    resolution,
+    max_points,
+    strategy,
+    strategy_name,
+    stream,
+):
+    """ The timeline for get_debt_timeline()'s checked query parameters """
+    def load():
+        debts = ordered_debts(request.user, strategy)
+
+        user = User.objects.get(username=request.user.username)
+        # Amount to put towards debts
+        payment = user.get_money_after_expenses()
+        return debts, payment
+
+    if stream:
+        debts, payment = load()
+        try:
+            # The phases are simulated once, before any of it is written, so it is
+            # {"num_months": -1} when it is never paid off, the same as without
+            # ?stream=. Then the months are written from them, whatever the method
+            phases = simulation.simulate_phases(debts, payment)
+        except simulation.NotPaidOff:
             return Response({'num_months': -1})
-        # The current debt has been eliminated
-        num_months += result['num_months']
-        # Total debt each month for current debt
-        debt_per_month = result['debt_per_month']
-        if hasattr(debt, 'min_payment'):
-            payment += debt.min_payment
-        for debt in debts[index:]:
-            # Need to add the debt owing on each of the other debts
-            # minus the minimum payment for each month
-            for month in debt_per_month:
-                if hasattr(debt, 'min_payment'):
-                    month += debt.balance + debt.cost() - debt.min_payment
-                else:
-                    month += debt.balance + debt.cost()
+        if resolution != 1 or max_points is not None:
+            points = simulation.phase_points(phases, resolution=resolution, max_points=max_points)
+            items = ((month, [month, debt]) for month, debt in points)
+            key = 'points'
+        else:
+            items = enumerate(simulation.phase_balances(phases), 1)
+            key = 'debt_per_month'
+        return StreamingHttpResponse(
+            stream_timeline(items, key),
+            content_type='application/json',
+        )
+
+    def compute():
+        debts, payment = load()
+        return run_simulation(
+            simulation.simulate,
+            debts,
+            payment,
+            method=method,
+            months=months,
+            resolution=resolution,
+            max_points=max_points,
+        )
+
+    name = 'timeline:{}:{}:{}:{}:{}'.format(
+        strategy_name,
+        method,
+        ','.join(str(month) for month in months) if months is not None else '',
+        resolution,
+        max_points,
+    )
+    timeline = caching.get_or_compute(request, name, compute)
+    if array_format is not None and 'debt_per_month' in timeline:
+        timeline = dict(timeline, debt_per_month=renderers.float32_array(timeline['debt_per_month']))
+    return Response(timeline)
+
+
+def stream_timeline(items, key, chunk_size=512):
+    """
+    Write the timeline as JSON while it is being generated from
+    (month, value) items of a debt that is paid off.
 
-    return Response({
-        'num_months': num_months,
-        'debt_per_month': debt_per_month
-    })
+    num_months comes last since it is only known at the end.
+    """
+    yield '{{"{}": ['.format(key)
+    num_months = 0
+    written = 0
+    chunk = []
+    for num_months, value in items:
+        chunk.append(json.dumps(value))
+        if len(chunk) == chunk_size:
+            yield (',' if written else '') + ','.join(chunk)
+            written += len(chunk)
+            chunk = []
+    if chunk:
+        yield (',' if written else '') + ','.join(chunk)
+    yield '], "num_months": {}}}'.format(num_months)
+
+
+@api_view(['POST'])
+@permission_classes((permissions.IsAuthenticated,))
+def import_transactions(request):
+    """
+    Import expenses and incomes from an uploaded CSV or OFX file,
+    ?file_format= is needed when the file name doesn't end with .csv or .ofx
+    """
+    upload = request.FILES.get('file')
+    if upload is None:
+        return Response({'file': ['No file was submitted.']}, status=status.HTTP_400_BAD_REQUEST)
+    file_format = request.query_params.get('file_format') or importing.guess_format(upload.name)
+    if file_format not in importing.FORMATS:
+        return Response(
+            {'file_format': ['Must be one of {}.'.format(', '.join(importing.FORMATS))]},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    try:
+        # Read a line at a time, large uploads are kept on disk
+        summary = importing.import_file(request.user, upload, file_format)
+    except importing.InvalidFile as error:
+        return Response({'file': [str(error)]}, status=status.HTTP_400_BAD_REQUEST)
+    return Response(summary, status=status.HTTP_201_CREATED)
+
+
+@api_view(['GET'])
+@permission_classes((permissions.IsAuthenticated,))
+def export_data(request):
+    """
+    Stream all of the user's data as NDJSON, or one model's data as CSV
+    with ?file_format=csv&model=expenses
+    """
+    file_format = request.query_params.get('file_format', 'ndjson')
+    if file_format not in exporting.FORMATS:
+        return Response(
+            {'file_format': ['Must be one of {}.'.format(', '.join(exporting.FORMATS))]},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    if file_format == 'csv':
+        name = request.query_params.get('model')
+        if name not in exporting.MODELS:
+            return Response(
+                {'model': ['Must be one of {}.'.format(', '.join(exporting.MODELS))]},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        chunks = exporting.csv_file(request.user, name)
+        file_name = name + '.csv'
+    else:
+        chunks = exporting.ndjson(request.user)
+        file_name = 'export.ndjson'
+
+    response = StreamingHttpResponse(chunks, content_type=exporting.CONTENT_TYPES[file_format])
+    response['Content-Disposition'] = 'attachment; filename="{}"'.format(file_name)
+    return response
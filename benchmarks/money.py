@@ -0,0 +1,56 @@
+"""
+Compare api.money with the serialize_money() and Decimal parsing it
+replaced.
+
+python benchmarks/money.py [number of values]
+"""
+import decimal
+import os
+import random
+import sys
+import timeit
+
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from api.money import format_cents, format_cents_many, parse_cents, parse_cents_many  # noqa: E402
+
+
+def old_serialize_money(money_int):
+    money_str = str(money_int)
+    return money_str[:-2] + '.' + money_str[-2:]
+
+
+def old_parse_money(value):
+    return int(decimal.Decimal(value) * 100)
+
+
+def main(count):
+    random.seed(0)
+    # At least a dollar, the old function is wrong for less
+    values = [random.randint(100, 100000_00) for index in range(count)]
+    texts = format_cents_many(values)
+    assert texts == [old_serialize_money(value) for value in values]
+    assert parse_cents_many(texts) == [old_parse_money(text) for text in texts]
+
+    timings = (
+        ('serialize_money()', lambda: [old_serialize_money(value) for value in values]),
+        ('format_cents()', lambda: [format_cents(value) for value in values]),
+        ('format_cents_many()', lambda: format_cents_many(values)),
+        ('Decimal parsing', lambda: [old_parse_money(text) for text in texts]),
+        ('parse_cents()', lambda: [parse_cents(text) for text in texts]),
+        ('parse_cents_many()', lambda: parse_cents_many(texts)),
+    )
+    print('{} values'.format(count))
+    baseline = None
+    for name, function in timings:
+        seconds = min(timeit.repeat(function, number=1, repeat=3))
+        if name in ('serialize_money()', 'Decimal parsing'):
+            baseline = seconds
+            print('{:20} {:.4f}s'.format(name, seconds))
+        else:
+            print('{:20} {:.4f}s ({:.1f}x faster)'.format(name, seconds, baseline / seconds))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000000)
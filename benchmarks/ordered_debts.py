@@ -0,0 +1,87 @@
+"""
+Compare ordered_debts(), which has the database order the debts, with
+fetching them and sorting them in Python.
+
+Runs against a test database of its own, not db.sqlite3.
+
+python benchmarks/ordered_debts.py [number of debts]
+"""
+import os
+import random
+import sys
+import timeit
+
+import django
+
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'debt.settings')
+django.setup()
+
+from django.contrib.auth import get_user_model  # noqa: E402
+from django.db import connection  # noqa: E402
+
+from api.models import CreditCard, Overdraft  # noqa: E402
+from api.queries import STRATEGIES, ordered_debts  # noqa: E402
+
+
+# The strategies as they were in Python, highest first
+SORT_KEYS = {
+    'cost': lambda debt: debt.cost(),
+    'avalanche': lambda debt: debt.terms().rate,
+    'snowball': lambda debt: -debt.balance,
+}
+
+
+def sort_debts(user, strategy):
+    debts = list(Overdraft.objects.filter(user=user)) + list(CreditCard.objects.filter(user=user))
+    return sorted(debts, key=SORT_KEYS[strategy], reverse=True)
+
+
+def make_debts(user, count):
+    credit_cards = []
+    overdrafts = []
+    for index in range(count):
+        if index % 4:
+            credit_cards.append(CreditCard(
+                name=str(index),
+                interest_rate=random.uniform(0, 30),
+                balance=random.randint(0, 20000_00),
+                min_payment=10_00,
+                min_payment_percent=0.03,
+                annual_fee=random.choice([0, 99_00, 120_00]),
+                user=user,
+            ))
+        else:
+            overdrafts.append(Overdraft(
+                name=str(index),
+                interest_rate=random.uniform(0, 2),
+                balance=random.randint(0, 5000_00),
+                monthly_fee=random.choice([0, 5_00]),
+                user=user,
+            ))
+    CreditCard.objects.bulk_create(credit_cards)
+    Overdraft.objects.bulk_create(overdrafts)
+
+
+def main(count):
+    random.seed(0)
+    old_name = connection.creation.create_test_db(verbosity=0)
+    try:
+        user = get_user_model().objects.create_user(username='benchmark', password='benchmark')
+        make_debts(user, count)
+        number = 10
+        print('{} debts'.format(count))
+        for strategy in STRATEGIES:
+            assert len(ordered_debts(user, strategy)) == len(sort_debts(user, strategy)) == count
+            python = timeit.timeit(lambda: sort_debts(user, strategy), number=number) / number
+            database = timeit.timeit(lambda: ordered_debts(user, strategy), number=number) / number
+            print('{:10} sorted in Python: {:.4f}s  ordered_debts(): {:.4f}s  speedup {:.2f}x'.format(
+                strategy, python, database, python / database,
+            ))
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5000)
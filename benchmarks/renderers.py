@@ -0,0 +1,68 @@
+"""
+Compare the renderers on a page of credit cards and a long timeline.
+
+python benchmarks/renderers.py [number of rows]
+"""
+import os
+import random
+import sys
+import timeit
+
+import django
+
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'debt.settings')
+django.setup()
+
+from api.renderers import JSONRenderer, MessagePackRenderer, ORJSONRenderer, float32_array  # noqa: E402
+
+
+def make_cards(count):
+    return [
+        {
+            'id': '6f1c1a52-3f0e-4a55-8c7e-{:012d}'.format(index),
+            'name': 'Card {}'.format(index),
+            'interest_rate': random.uniform(0, 30),
+            'balance': '{}.{:02d}'.format(random.randint(0, 20000), random.randint(0, 99)),
+            'min_payment': '10.00',
+            'min_payment_percent': 3.0,
+            'annual_fee': random.choice([0, '99.00', '120.00']),
+            'url': '/api/v1.0/credit-cards/6f1c1a52-3f0e-4a55-8c7e-{:012d}/'.format(index),
+        }
+        for index in range(count)
+    ]
+
+
+def make_timeline(count):
+    debt = 5000000.0
+    debt_per_month = []
+    for month in range(count):
+        debt = debt * 1.01 - random.uniform(50000, 60000)
+        debt_per_month.append(debt)
+    return {'num_months': count, 'debt_per_month': debt_per_month}
+
+
+def main(count):
+    random.seed(0)
+    timeline = make_timeline(count)
+    payloads = (
+        ('credit cards', {'next': None, 'results': make_cards(count)}),
+        ('timeline', timeline),
+        ('float32 timeline', dict(timeline, debt_per_month=float32_array(timeline['debt_per_month']))),
+    )
+    number = 20
+    for name, data in payloads:
+        print('{} {}'.format(count, name))
+        baseline = None
+        for renderer in (JSONRenderer(), ORJSONRenderer(), MessagePackRenderer()):
+            size = len(renderer.render(data))
+            seconds = timeit.timeit(lambda: renderer.render(data), number=number) / number
+            baseline = baseline or seconds
+            print('{:20} {:.5f}s {:>9} bytes ({:.1f}x faster)'.format(
+                type(renderer).__name__, seconds, size, baseline / seconds,
+            ))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000)
@@ -0,0 +1,77 @@
+"""
+Compare DebtListSerializer with serializing each debt on its own as
+get_debts() used to.
+
+python benchmarks/serialize_debts.py [number of debts]
+"""
+import os
+import random
+import sys
+import timeit
+
+import django
+
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'debt.settings')
+django.setup()
+
+from api.models import CreditCard, Overdraft  # noqa: E402
+from api.serializers import CreditCardSerializer, DebtListSerializer  # noqa: E402
+from api.utils import serialize_money  # noqa: E402
+
+
+def serialize_each(debts):
+    serialized = []
+    for debt in debts:
+        if isinstance(debt, CreditCard):
+            serialized.append(CreditCardSerializer(debt).data)
+        else:
+            serialized.append({
+                'id': str(debt.id),
+                'name': debt.name,
+                'interest_rate': debt.interest_rate,
+                'balance': serialize_money(debt.balance),
+                'monthly_fee': serialize_money(debt.monthly_fee),
+                'type': 'overdraft'
+            })
+    return serialized
+
+
+def make_debts(count):
+    debts = []
+    for index in range(count):
+        if index % 4:
+            debts.append(CreditCard(
+                name=str(index),
+                interest_rate=random.uniform(0, 30),
+                balance=random.randint(1, 20000_00),
+                min_payment=10_00,
+                min_payment_percent=0.03,
+                annual_fee=random.choice([0, 99_00, 120_00]),
+            ))
+        else:
+            debts.append(Overdraft(
+                name=str(index),
+                interest_rate=random.uniform(0, 2),
+                balance=random.randint(1, 5000_00),
+                monthly_fee=random.choice([1_00, 5_00]),
+            ))
+    return debts
+
+
+def main(count):
+    random.seed(0)
+    debts = make_debts(count)
+    assert len(DebtListSerializer(debts).data) == len(serialize_each(debts))
+
+    number = 10
+    each = timeit.timeit(lambda: serialize_each(debts), number=number) / number
+    batch = timeit.timeit(lambda: DebtListSerializer(debts).data, number=number) / number
+    print('{} debts'.format(count))
+    print('each debt:          {:.4f}s'.format(each))
+    print('DebtListSerializer: {:.4f}s ({:.0f}x faster)'.format(batch, each / batch))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000)
@@ -0,0 +1,51 @@
+"""
+ASGI config for debt project.
+
+It exposes the ASGI callable as a module-level variable named ``application``.
+
+For more information on this file, see
+https://docs.djangoproject.com/en/dev/howto/deployment/asgi/
+"""
+
+import os
+
+import django
+from asgiref.sync import sync_to_async
+from django.core.handlers import asgi
+
+
+class ASGIHandler(asgi.ASGIHandler):
+    """
+    Django's ASGIHandler with the parts of streaming responses, such as
+    the export and the streamed timeline, produced in the request's
+    thread. Django 4.0 iterates them in the event loop, where their
+    queries aren't allowed and their work would hold up every other
+    request.
+    """
+
+    async def send_response(self, response, send):
+        if not response.streaming:
+            return await super().send_response(response, send)
+        parts = iter(response)
+        # Django sends the headers and the end of an empty body, the parts go in between
+        response.streaming_content = ()
+        # The thread the view ran in, with its database connection
+        next_part = sync_to_async(next, thread_sensitive=True)
+
+        async def send_parts(message):
+            if message == {'type': 'http.response.body'}:
+                while True:
+                    part = await next_part(parts, None)
+                    if part is None:
+                        break
+                    for chunk, last in self.chunk_bytes(part):
+                        await send({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+            await send(message)
+
+        await super().send_response(response, send_parts)
+
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "debt.settings")
+
+django.setup(set_prefix=False)
+application = ASGIHandler()
@@ -0,0 +1,15 @@
+"""
+URLs under ASGI, debt.urls with the async views of api.asgi_urls.
+Set for each request by api.concurrency.asgi_urlconf_middleware.
+"""
+from django.contrib import admin
+from django.urls import include, path
+
+from .urls import schema_view
+
+
+urlpatterns = [
+    path('api/v1.0/', include('api.asgi_urls')),
+    path('docs/', schema_view),
+    path('admin/', admin.site.urls),
+]
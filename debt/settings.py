@@ -54,18 +54,32 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    # Last, so it is async under ASGI
+    'api.concurrency.asgi_urlconf_middleware',
 ]
 
 CORS_ORIGIN_ALLOW_ALL = True
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework.authentication.TokenAuthentication',
+        'api.authentication.CachedTokenAuthentication',
         # 'rest_framework.authentication.SessionAuthentication',
-    )
+    ),
+    # JSON unless the client asks for one of the others, see api.renderers
+    'DEFAULT_RENDERER_CLASSES': (
+        'api.renderers.JSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+        'api.renderers.ORJSONRenderer',
+        'api.renderers.MessagePackRenderer',
+    ),
+    # ViewSets with small lists set pagination_class = None
+    'DEFAULT_PAGINATION_CLASS': 'api.pagination.KeysetPagination',
+    'PAGE_SIZE': 100,
 }
 
 ROOT_URLCONF = 'debt.urls'
+# With the async views, for ?wait=, see api.concurrency
+ASGI_URLCONF = 'debt.asgi_urls'
 
 TEMPLATES = [
     {
@@ -84,6 +98,10 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'debt.wsgi.application'
+ASGI_APPLICATION = 'debt.asgi.application'
+
+# Processes to run timeline simulations in, 0 runs them in a pool of threads
+SIMULATION_PROCESSES = 0
 
 
 # Database
@@ -107,6 +125,22 @@ DATABASES = {
 #     }
 # }
 
+# Cache for the results of /debts/ and /timeline/
+# https://docs.djangoproject.com/en/dev/topics/cache/
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
+# CACHES = {
+#     'default': {
+#         'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+#         'LOCATION': os.path.join(BASE_DIR, 'tmp', 'cache'),
+#     }
+# }
+
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 # Internationalization